@@ -22,10 +22,27 @@ try:
 except:
     pass
 import ast
+import base64
+import fcntl
+import hashlib
 import json
-import re
+import multiprocessing
+import os
+import queue
+import random
 import sys
-from datetime import datetime
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import partial
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlencode
 
 import magic
 import pytz
@@ -33,11 +50,18 @@ import requests
 from bs4 import BeautifulSoup, UnicodeDammit
 from phantom.action_result import ActionResult
 from phantom.base_connector import BaseConnector
+from phantom.vault import Vault
 
 from servicenow_consts import *
+from servicenow_ioc_extractor import extract_iocs, get_issue_text
 
 DT_STR_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
 
+# Pooled sessions are shared by every connector instance of the process,
+# so that consecutive actions keep reusing the already opened connections
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
 
 class UnauthorizedOAuthTokenException(Exception):
     pass
@@ -48,6 +72,37 @@ class RetVal(tuple):
         return tuple.__new__(RetVal, (status, data))
 
 
+class UploadFileReader(object):
+    """ File object wrapper streaming a file to the request body one block at a time, reporting the progress on the way.
+    The length lets requests send a Content-Length header instead of a chunked body, and tell/seek let the body be
+    rewound when the request is retried.
+    """
+
+    def __init__(self, file_obj, size, progress_callback=None):
+        self._file = file_obj
+        self._size = size
+        self._progress_callback = progress_callback
+        self._next_progress = SERVICENOW_UPLOAD_PROGRESS_STEP
+
+    def __len__(self):
+        return self._size
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        position = self._file.tell()
+        if self._progress_callback and position >= self._next_progress:
+            self._next_progress = position + SERVICENOW_UPLOAD_PROGRESS_STEP
+            self._progress_callback(position, self._size)
+        return data
+
+    def tell(self):
+        return self._file.tell()
+
+    def seek(self, offset, whence=0):
+        self._next_progress = SERVICENOW_UPLOAD_PROGRESS_STEP
+        return self._file.seek(offset, whence)
+
+
 class ServicenowConnector(BaseConnector):
 
     # actions supported by this script
@@ -66,6 +121,11 @@ class ServicenowConnector(BaseConnector):
     ACTION_ID_GET_VARIABLES = "get_variables"
     ACTION_ID_ON_POLL = "on_poll"
     ACTION_ID_RUN_QUERY = "run_query"
+    ACTION_ID_GET_TICKETS = "get_tickets"
+    ACTION_ID_BULK_CREATE_TICKETS = "bulk_create_tickets"
+    ACTION_ID_BULK_UPDATE_TICKETS = "bulk_update_tickets"
+    ACTION_ID_BULK_ADD_WORK_NOTES = "bulk_add_work_notes"
+    ACTION_ID_BULK_ADD_COMMENTS = "bulk_add_comments"
 
     def __init__(self):
 
@@ -76,8 +136,43 @@ class ServicenowConnector(BaseConnector):
         self._try_oauth = False
         self._use_token = False
         self._state = {}
+        self._session = None
+        self._timeout = None
+        self._page_concurrency = SERVICENOW_DEFAULT_PAGE_CONCURRENCY
+        self._extraction_workers = SERVICENOW_DEFAULT_EXTRACTION_WORKERS
+        self._extraction_pool = None
+        # Guards the creation of the extraction pool shared by the tables polled concurrently
+        self._extraction_lock = threading.Lock()
+        self._ingest_batch_size = SERVICENOW_DEFAULT_INGEST_BATCH_SIZE
+        self._fingerprint_cache_size = SERVICENOW_DEFAULT_FINGERPRINT_CACHE_SIZE
+        # Ticket fingerprints of the asset, loaded at the start of a poll and persisted once at its end
+        self._fingerprints = dict()
+        self._backfill_slices = SERVICENOW_DEFAULT_BACKFILL_SLICES
+        self._backfill_workers = SERVICENOW_DEFAULT_BACKFILL_WORKERS
+        # Guards the state and the platform writes shared by the tables polled concurrently
+        self._poll_lock = threading.RLock()
+        self._oauth_expiry_skew = SERVICENOW_DEFAULT_OAUTH_EXPIRY_SKEW
+        self._oauth_lock = threading.Lock()
+        self._max_retries = SERVICENOW_DEFAULT_MAX_RETRIES
+        self._retry_max_backoff = SERVICENOW_DEFAULT_RETRY_MAX_BACKOFF
+        self._retry_stats = {'retries': 0, 'backoff_seconds': 0}
+        self._retry_lock = threading.Lock()
+        self._rate_limit = SERVICENOW_DEFAULT_RATE_LIMIT
+        self._max_concurrency = SERVICENOW_DEFAULT_MAX_CONCURRENCY
+        self._sys_id_cache_size = SERVICENOW_DEFAULT_SYS_ID_CACHE_SIZE
+        self._sys_id_cache_stats = {'hits': 0, 'misses': 0}
+        self._bulk_stats = {'batch_api': True, 'batch_requests': 0}
+        self._max_attachment_size = SERVICENOW_DEFAULT_MAX_ATTACHMENT_SIZE
+        self._ingest_attachments = False
+        self._max_ingest_attachment_size = SERVICENOW_DEFAULT_MAX_INGEST_ATTACHMENT_SIZE
+        self._max_poll_attachment_size = SERVICENOW_DEFAULT_MAX_POLL_ATTACHMENT_SIZE
+        # Bytes of attachments downloaded by the current poll, shared by the tables polled concurrently
+        self._poll_attachment_bytes = 0
 
     def finalize(self):
+        if self._extraction_pool is not None:
+            self._extraction_pool.shutdown()
+            self._extraction_pool = None
         self.save_state(self._state)
         return phantom.APP_SUCCESS
 
@@ -112,6 +207,89 @@ class ServicenowConnector(BaseConnector):
             if len(severity) > 20:
                 return self.set_status(phantom.APP_ERROR, 'Severity length must be less than equal to 20 characters')
 
+        pool_connections = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_POOL_CONNECTIONS, SERVICENOW_DEFAULT_POOL_CONNECTIONS), SERVICENOW_JSON_POOL_CONNECTIONS)
+        if pool_connections is None:
+            return self.get_status()
+
+        pool_maxsize = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_POOL_MAXSIZE, SERVICENOW_DEFAULT_POOL_MAXSIZE), SERVICENOW_JSON_POOL_MAXSIZE)
+        if pool_maxsize is None:
+            return self.get_status()
+
+        connect_timeout = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_CONNECT_TIMEOUT, SERVICENOW_DEFAULT_CONNECT_TIMEOUT), SERVICENOW_JSON_CONNECT_TIMEOUT)
+        if connect_timeout is None:
+            return self.get_status()
+
+        read_timeout = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_READ_TIMEOUT, SERVICENOW_DEFAULT_READ_TIMEOUT), SERVICENOW_JSON_READ_TIMEOUT)
+        if read_timeout is None:
+            return self.get_status()
+
+        self._timeout = (connect_timeout, read_timeout)
+        self._session = self._get_session(pool_connections, pool_maxsize)
+
+        self._page_concurrency = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_PAGE_CONCURRENCY, SERVICENOW_DEFAULT_PAGE_CONCURRENCY), SERVICENOW_JSON_PAGE_CONCURRENCY)
+        if self._page_concurrency is None:
+            return self.get_status()
+
+        self._extraction_workers = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_EXTRACTION_WORKERS, SERVICENOW_DEFAULT_EXTRACTION_WORKERS), SERVICENOW_JSON_EXTRACTION_WORKERS)
+        if self._extraction_workers is None:
+            return self.get_status()
+
+        self._ingest_batch_size = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_INGEST_BATCH_SIZE, SERVICENOW_DEFAULT_INGEST_BATCH_SIZE), SERVICENOW_JSON_INGEST_BATCH_SIZE)
+        if self._ingest_batch_size is None:
+            return self.get_status()
+
+        self._fingerprint_cache_size = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_FINGERPRINT_CACHE_SIZE, SERVICENOW_DEFAULT_FINGERPRINT_CACHE_SIZE),
+            SERVICENOW_JSON_FINGERPRINT_CACHE_SIZE, allow_zero=True)
+        if self._fingerprint_cache_size is None:
+            return self.get_status()
+
+        self._sys_id_cache_size = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_SYS_ID_CACHE_SIZE, SERVICENOW_DEFAULT_SYS_ID_CACHE_SIZE),
+            SERVICENOW_JSON_SYS_ID_CACHE_SIZE, allow_zero=True)
+        if self._sys_id_cache_size is None:
+            return self.get_status()
+        # A disabled cache drops the resolutions cached before
+        if not self._sys_id_cache_size:
+            self._state.pop('sys_ids', None)
+
+        self._max_attachment_size = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_MAX_ATTACHMENT_SIZE, SERVICENOW_DEFAULT_MAX_ATTACHMENT_SIZE),
+            SERVICENOW_JSON_MAX_ATTACHMENT_SIZE, allow_zero=True)
+        if self._max_attachment_size is None:
+            return self.get_status()
+
+        self._ingest_attachments = config.get(SERVICENOW_JSON_INGEST_ATTACHMENTS, False)
+
+        self._max_ingest_attachment_size = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_MAX_INGEST_ATTACHMENT_SIZE, SERVICENOW_DEFAULT_MAX_INGEST_ATTACHMENT_SIZE),
+            SERVICENOW_JSON_MAX_INGEST_ATTACHMENT_SIZE)
+        if self._max_ingest_attachment_size is None:
+            return self.get_status()
+
+        self._max_poll_attachment_size = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_MAX_POLL_ATTACHMENT_SIZE, SERVICENOW_DEFAULT_MAX_POLL_ATTACHMENT_SIZE),
+            SERVICENOW_JSON_MAX_POLL_ATTACHMENT_SIZE)
+        if self._max_poll_attachment_size is None:
+            return self.get_status()
+
+        self._backfill_slices = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_BACKFILL_SLICES, SERVICENOW_DEFAULT_BACKFILL_SLICES), SERVICENOW_JSON_BACKFILL_SLICES)
+        if self._backfill_slices is None:
+            return self.get_status()
+
+        self._backfill_workers = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_BACKFILL_WORKERS, SERVICENOW_DEFAULT_BACKFILL_WORKERS), SERVICENOW_JSON_BACKFILL_WORKERS)
+        if self._backfill_workers is None:
+            return self.get_status()
+
         self._host = self._base_url[self._base_url.find('//') + 2:]
         self._headers = {'Accept': 'application/json'}
         # self._headers.update({'X-no-response-body': 'true'})
@@ -119,6 +297,34 @@ class ServicenowConnector(BaseConnector):
         if self.get_action_identifier() in sn_sc_actions:
             self._api_uri = '/api/sn_sc'
 
+        self._oauth_expiry_skew = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_OAUTH_EXPIRY_SKEW, SERVICENOW_DEFAULT_OAUTH_EXPIRY_SKEW), SERVICENOW_JSON_OAUTH_EXPIRY_SKEW,
+            allow_zero=True)
+        if self._oauth_expiry_skew is None:
+            return self.get_status()
+
+        self._max_retries = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_MAX_RETRIES, SERVICENOW_DEFAULT_MAX_RETRIES), SERVICENOW_JSON_MAX_RETRIES, allow_zero=True)
+        if self._max_retries is None:
+            return self.get_status()
+
+        self._retry_max_backoff = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_RETRY_MAX_BACKOFF, SERVICENOW_DEFAULT_RETRY_MAX_BACKOFF), SERVICENOW_JSON_RETRY_MAX_BACKOFF,
+            allow_zero=True)
+        if self._retry_max_backoff is None:
+            return self.get_status()
+
+        self._rate_limit = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_RATE_LIMIT, SERVICENOW_DEFAULT_RATE_LIMIT), SERVICENOW_JSON_RATE_LIMIT, allow_zero=True)
+        if self._rate_limit is None:
+            return self.get_status()
+
+        self._max_concurrency = self._validate_integers(self,
+            config.get(SERVICENOW_JSON_MAX_CONCURRENCY, SERVICENOW_DEFAULT_MAX_CONCURRENCY), SERVICENOW_JSON_MAX_CONCURRENCY,
+            allow_zero=True)
+        if self._max_concurrency is None:
+            return self.get_status()
+
         self._client_id = config.get(SERVICENOW_JSON_CLIENT_ID, None)
         if self._client_id:
             try:
@@ -130,6 +336,29 @@ class ServicenowConnector(BaseConnector):
 
         return phantom.APP_SUCCESS
 
+    def _get_session(self, pool_connections, pool_maxsize):
+        """ This method returns the pooled keep-alive session of the process for the given pool settings,
+        creating it on first use.
+        :param pool_connections: Number of per-host connection pools to cache
+        :param pool_maxsize: Maximum number of connections to keep open per host
+        :return: requests.Session object
+        """
+
+        key = (pool_connections, pool_maxsize)
+        with _SESSIONS_LOCK:
+            session = _SESSIONS.get(key)
+            if session is None:
+                session = requests.Session()
+                # Authentication is sent with every request, so never let a cookie issued
+                # for one asset's credentials leak into the calls made for another asset
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _SESSIONS[key] = session
+
+        return session
+
     def _handle_py_ver_compat_for_input_str(self, input_str):
         """
         This method returns the encoded|original string based on the Python version.
@@ -369,12 +598,13 @@ class ServicenowConnector(BaseConnector):
         resp_json = None
 
         try:
-            r = requests.post('{}{}{}'.format(self._base_url,     # nosemgrep: python.requests.best-practice.use-timeout.use-timeout
+            r = self._send_request("post", '{}{}{}'.format(self._base_url,
                     self._api_uri, endpoint),
                     auth=auth,
                     data=data,
                     headers=headers,
-                    params=params)
+                    params=params,
+                    timeout=self._timeout)
         except Exception as e:
             error_msg = self._get_error_message_from_exception(e)
             return RetVal(action_result.set_status(phantom.APP_ERROR,
@@ -382,6 +612,172 @@ class ServicenowConnector(BaseConnector):
 
         return self._process_response(r, action_result)
 
+    @contextmanager
+    def _rate_limited(self):
+        """ This method paces the requests of all the connector processes of the asset on the host to rate_limit
+        requests per second and keeps at most max_concurrency of them in flight.
+        :return: context manager held while the request is made
+        """
+
+        if self._rate_limit:
+            self._wait_for_rate_limit()
+
+        slot = self._acquire_concurrency_slot() if self._max_concurrency else None
+        try:
+            yield
+        finally:
+            if slot is not None:
+                fcntl.flock(slot, fcntl.LOCK_UN)
+                slot.close()
+
+    def _wait_for_rate_limit(self):
+        """ This method takes the next request slot of the token bucket shared through a file of the app state
+        directory. Every request reserves the slot following the last reserved one, so the requests are spread
+        evenly instead of bursting and stalling around the limit.
+        :return: None
+        """
+
+        bucket_path = os.path.join(self.get_state_dir(), '{0}_rate_limit.json'.format(self.get_asset_id()))
+        interval = 1.0 / self._rate_limit
+        burst = max(0.0, SERVICENOW_RATE_LIMIT_BURST - interval)
+
+        try:
+            with open(bucket_path, 'a+') as bucket_file:
+                fcntl.flock(bucket_file, fcntl.LOCK_EX)
+                bucket_file.seek(0)
+                try:
+                    next_slot = float(json.load(bucket_file).get('next_slot', 0))
+                except (ValueError, AttributeError):
+                    next_slot = 0.0
+
+                now = time.time()
+                next_slot = max(next_slot, now)
+                wait = next_slot - burst - now
+
+                bucket_file.seek(0)
+                bucket_file.truncate()
+                json.dump({'next_slot': next_slot + interval}, bucket_file)
+        except (IOError, OSError) as e:
+            self.debug_print("Unable to use the rate limit token bucket: {0}".format(self._get_error_message_from_exception(e)))
+            return
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def _acquire_concurrency_slot(self):
+        """ This method waits for one of the max_concurrency slot lock files of the asset to be free and locks it.
+        :return: locked slot file to close once the request is done, None if the slots can not be used
+        """
+
+        slot_path = os.path.join(self.get_state_dir(), '{0}_concurrency'.format(self.get_asset_id()))
+
+        while True:
+            for index in range(self._max_concurrency):
+                try:
+                    slot = open('{0}_{1}.lock'.format(slot_path, index), 'a')
+                except (IOError, OSError) as e:
+                    self.debug_print("Unable to use the concurrency slots: {0}".format(self._get_error_message_from_exception(e)))
+                    return None
+
+                try:
+                    fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return slot
+                except (IOError, OSError):
+                    slot.close()
+
+            time.sleep(SERVICENOW_CONCURRENCY_POLL_INTERVAL)
+
+    def _get_retry_delay(self, response, attempt):
+        """ This method computes how long to wait before retrying a request. The delay requested by the server
+        through Retry-After or X-RateLimit-Reset is honored, an exponential backoff with full jitter is used otherwise.
+        :param response: Response of the failed request, None if no response was received
+        :param attempt: Number of the retries already made for the request
+        :return: delay in seconds
+        """
+
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    return max(0.0, float(retry_after))
+                except ValueError:
+                    try:
+                        return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+                    except (TypeError, ValueError):
+                        pass
+
+            # ServiceNow reports the end of the rate limit window as a UNIX timestamp
+            if response.headers.get('X-RateLimit-Remaining') == '0' and response.headers.get('X-RateLimit-Reset'):
+                try:
+                    return max(0.0, float(response.headers['X-RateLimit-Reset']) - time.time())
+                except ValueError:
+                    pass
+
+        return random.uniform(0, min(SERVICENOW_RETRY_MAX_DELAY, SERVICENOW_RETRY_BASE_DELAY * 2 ** attempt))
+
+    def _send_request(self, method, url, **kwargs):
+        """ This method sends a request on the session within the rate limit of the asset, retrying it with a backoff
+        when it was rate limited or failed.
+        The rate limited (429) requests were not processed by the server and are retried whatever the method. The
+        server errors, the timeouts and the connection errors are only retried for the idempotent methods, except for
+        the connection timeouts, since the request never reached the server.
+        :param method: HTTP method of the request
+        :param url: URL of the request
+        :param kwargs: Arguments of the request
+        :return: response of the last attempt, the exception of the last attempt is raised if it got no response
+        """
+
+        idempotent = method in SERVICENOW_IDEMPOTENT_METHODS
+        attempt = 0
+
+        # A streamed body is consumed by every attempt, so it is rewound before retrying
+        body = kwargs.get('data')
+        body_position = body.tell() if hasattr(body, 'seek') else None
+
+        while True:
+            if attempt and body_position is not None:
+                body.seek(body_position)
+
+            response = None
+            try:
+                # Every attempt takes its own token of the rate limit and concurrency slot, the slot is given
+                # back before backing off so that the other requests are not held up by the retries
+                with self._rate_limited():
+                    response = getattr(self._session, method)(url, **kwargs)
+                error = None
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+
+            if error is not None:
+                retry = idempotent or isinstance(error, requests.exceptions.ConnectTimeout)
+            elif response.status_code == 429 or (response.status_code == 503 and 'Retry-After' in response.headers):
+                retry = True
+            else:
+                retry = idempotent and response.status_code in SERVICENOW_RETRY_STATUS_CODES
+
+            if retry and attempt < self._max_retries:
+                delay = self._get_retry_delay(response, attempt)
+                with self._retry_lock:
+                    retry = self._retry_stats['backoff_seconds'] + delay <= self._retry_max_backoff
+                    if retry:
+                        self._retry_stats['retries'] += 1
+                        self._retry_stats['backoff_seconds'] += delay
+            else:
+                retry = False
+
+            if not retry:
+                if error is not None:
+                    raise error
+                return response
+
+            self.debug_print("Retrying the {0} request in {1:.2f} seconds after {2}".format(
+                method.upper(), delay, error if error is not None else "status code {0}".format(response.status_code)))
+            # The connection of a streamed response is only given back to the session pool once closed
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
     def _make_rest_call_oauth(self, action_result, headers={}, data={}):
         """ The API for retrieving the OAuth token is different enough to where its just easier to make a new function
         """
@@ -389,9 +785,11 @@ class ServicenowConnector(BaseConnector):
 
         try:
             request_url = '{}{}'.format(self._base_url, '/oauth_token.do')
-            r = requests.post(  # nosemgrep
+            r = self._send_request(
+                    "post",
                     request_url,
-                    data=data  # Mostly this line
+                    data=data,  # Mostly this line
+                    timeout=self._timeout
             )
         except Exception as e:
             error_msg = self._get_error_message_from_exception(e)
@@ -400,7 +798,8 @@ class ServicenowConnector(BaseConnector):
 
         return self._process_response(r, action_result)
 
-    def _make_rest_call(self, action_result, endpoint, headers=None, params=None, data=None, auth=None, method="get"):
+    def _make_rest_call(self, action_result, endpoint, headers=None, params=None, data=None, auth=None, method="get",
+                        response_headers=None, response_info=None):
 
         if headers is None:
             headers = {}
@@ -411,56 +810,69 @@ class ServicenowConnector(BaseConnector):
             headers.update({'Content-Type': 'application/json'})
 
         resp_json = None
-        request_func = getattr(requests, method)
 
-        if not request_func:
-            action_result.set_status(phantom.APP_ERROR, SERVICENOW_ERR_API_UNSUPPORTED_METHOD, method=method)
+        if method not in SERVICENOW_SUPPORTED_METHODS:
+            return RetVal(action_result.set_status(phantom.APP_ERROR, SERVICENOW_ERR_API_UNSUPPORTED_METHOD), resp_json)
 
         try:
-            r = request_func('{}{}{}'.format(self._base_url, self._api_uri, endpoint),
+            r = self._send_request(method, '{}{}{}'.format(self._base_url, self._api_uri, endpoint),
                     auth=auth,
                     json=data,
                     headers=headers,
-                    params=params)
+                    params=params,
+                    timeout=self._timeout)
         except Exception as e:
             error_msg = self._get_error_message_from_exception(e)
             return (action_result.set_status(phantom.APP_ERROR,
                         SERVICENOW_ERR_SERVER_CONNECTION.format(error_msg=error_msg)), resp_json)
 
+        # Callers interested in the response headers (e.g. X-Total-Count) or status code pass a dictionary to fill
+        if response_headers is not None:
+            response_headers.update(r.headers)
+        if response_info is not None:
+            response_info['status_code'] = r.status_code
+
+        if r.status_code == requests.codes.not_found:  # pylint: disable=E1101
+            self._evict_stale_sys_id(endpoint)
+
         return self._process_response(r, action_result)
 
-    def _make_rest_call_helper(self, action_result, endpoint, params={}, data={}, headers={}, method="get", auth=None):
+    def _make_rest_call_helper(self, action_result, endpoint, params={}, data={}, headers={}, method="get", auth=None,
+                               response_headers=None, response_info=None, retry_oauth=True):
         try:
-            return self._make_rest_call(action_result, endpoint,
-                                            params=params, data=data, headers=headers, method=method, auth=auth)
+            return self._make_rest_call(action_result, endpoint, params=params, data=data, headers=headers,
+                                            method=method, auth=auth, response_headers=response_headers,
+                                            response_info=response_info)
         except UnauthorizedOAuthTokenException:
             # We should only be here if we didn't generate a new token, and if the old token wasn't valid
-            # (Hopefully) this should only happen rarely
+            # (Hopefully) this should only happen rarely. The retry is tracked per call, since the
+            # calls made concurrently share the connector
             self.debug_print("UnauthorizedOAuthTokenException")
-            if self._try_oauth:
-                self._try_oauth = False
+            if retry_oauth:
                 ret_val, auth, headers = self._get_authorization_credentials(action_result, force_new=True)
                 if phantom.is_fail(ret_val):
                     return RetVal(phantom.APP_ERROR, None)
                 return self._make_rest_call_helper(
-                    action_result, endpoint, params=params, data=data, headers=headers, method=method, auth=auth
+                    action_result, endpoint, params=params, data=data, headers=headers, method=method, auth=auth,
+                    response_headers=response_headers, response_info=response_info, retry_oauth=False
                 )
             return RetVal(action_result.set_status(phantom.APP_ERROR, "Unable to authorize with OAuth token"), None)
 
-    def _upload_file_helper(self, action_result, endpoint, params={}, data={}, headers={}, auth=None):
+    def _upload_file_helper(self, action_result, endpoint, params={}, data={}, headers={}, auth=None, retry_oauth=True):
         try:
             return self._upload_file(action_result, endpoint, params=params, data=data, headers=headers, auth=auth)
         except UnauthorizedOAuthTokenException:
             # We should only be here if we didn't generate a new token, and if the old token wasn't valid
             # (Hopefully) this should only happen rarely
             self.debug_print("UnauthorizedOAuthTokenException")
-            if self._try_oauth:
-                self._try_oauth = False
+            if retry_oauth:
                 ret_val, auth, headers = self._get_authorization_credentials(action_result, force_new=True)
                 if phantom.is_fail(ret_val):
                     return RetVal(phantom.APP_ERROR, None)
+                if hasattr(data, 'seek'):
+                    data.seek(0)
                 return self._upload_file_helper(
-                    action_result, endpoint, params=params, data=data, headers=headers, auth=auth
+                    action_result, endpoint, params=params, data=data, headers=headers, auth=auth, retry_oauth=False
                 )
             return RetVal(action_result.set_status(phantom.APP_ERROR, "Unable to authorize with OAuth token"), None)
 
@@ -487,13 +899,7 @@ class ServicenowConnector(BaseConnector):
 
         if phantom.is_fail(ret_val) and params['grant_type'] == 'refresh_token':
             self.debug_print("Unable to generate new key with refresh token")
-            if 'first_run' in self._state:
-                if 'last_time' in self._state:
-                    self._state = {'first_run': self._state.get('first_run'), 'last_time': self._state.get('last_time')}
-                else:
-                    self._state = {'first_run': self._state.get('first_run')}
-            else:
-                self._state = {}
+            self._clear_oauth_token()
             # Try again, using a password
             return self._get_new_oauth_token(action_result)
 
@@ -507,31 +913,134 @@ class ServicenowConnector(BaseConnector):
         try:
             return RetVal(phantom.APP_SUCCESS, response_json['access_token'])
         except Exception as e:
-            if 'first_run' in self._state:
-                if 'last_time' in self._state:
-                    self._state = {'first_run': self._state.get('first_run'), 'last_time': self._state.get('last_time')}
-                else:
-                    self._state = {'first_run': self._state.get('first_run')}
-            else:
-                self._state = {}
+            self._clear_oauth_token()
             error_msg = self._get_error_message_from_exception(e)
             return RetVal(action_result.set_status(phantom.APP_ERROR,
                         "Unable to parse access token. {}".format(error_msg)), None)
 
+    def _clear_oauth_token(self):
+        """ This method drops the OAuth token from the state, the polling watermarks are kept.
+        :return: None
+        """
+
+        self._state.pop('oauth_token', None)
+        self._state.pop('retrieval_time', None)
+
+    def _is_oauth_token_fresh(self, token_info):
+        """ This method checks whether an OAuth token stays valid for longer than the expiry skew.
+        :param token_info: Dictionary with the oauth_token and its retrieval_time
+        :return: True if the token can still be used, False otherwise
+        """
+
+        try:
+            expires_in = int(token_info['oauth_token'].get('expires_in', 0))
+            age = (datetime.now() - datetime.strptime(token_info['retrieval_time'], DT_STR_FORMAT)).total_seconds()
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return False
+
+        return age < expires_in - self._oauth_expiry_skew
+
+    def _get_oauth_cache_path(self):
+        """ This method returns the path of the OAuth token cache shared by the connector processes of the asset.
+        :return: path of the token cache file
+        """
+
+        return os.path.join(self.get_state_dir(), '{0}_oauth_token.json'.format(self.get_asset_id()))
+
+    @contextmanager
+    def _oauth_cache_lock(self):
+        """ This method holds the exclusive lock of the OAuth token cache, so that a single connector process
+        refreshes the token while the other ones wait for it.
+        :return: context manager
+        """
+
+        try:
+            lock_file = open('{0}.lock'.format(self._get_oauth_cache_path()), 'a')
+        except (IOError, OSError) as e:
+            self.debug_print("Unable to open the OAuth token cache lock: {0}".format(self._get_error_message_from_exception(e)))
+            yield
+            return
+
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _read_oauth_cache(self):
+        """ This method reads the OAuth token cache shared by the connector processes of the asset.
+        :return: dictionary with the oauth_token and its retrieval_time, empty if there is no usable cache
+        """
+
+        try:
+            with open(self._get_oauth_cache_path(), 'r') as cache_file:
+                token_info = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return dict()
+
+        return token_info if isinstance(token_info, dict) else dict()
+
+    def _write_oauth_cache(self, token_info):
+        """ This method replaces the OAuth token cache shared by the connector processes of the asset.
+        The file is only readable by its owner since it holds the refresh token.
+        :param token_info: Dictionary with the oauth_token and its retrieval_time
+        :return: None
+        """
+
+        cache_path = self._get_oauth_cache_path()
+        temp_path = '{0}.tmp'.format(cache_path)
+        try:
+            with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as cache_file:
+                json.dump(token_info, cache_file)
+            os.replace(temp_path, cache_path)
+        except (IOError, OSError) as e:
+            self.debug_print("Unable to write the OAuth token cache: {0}".format(self._get_error_message_from_exception(e)))
+
     def _get_oauth_token(self, action_result, force_new=False):
-        if self._state.get('oauth_token') and not force_new:
-            expires_in = self._state.get('oauth_token', {}).get('expires_in', 0)
-            try:
-                diff = (datetime.now() - datetime.strptime(self._state['retrieval_time'], DT_STR_FORMAT)).total_seconds()
-                self.debug_print(diff)
-                if diff < expires_in:
-                    self.debug_print("Using old OAuth Token")
-                    return RetVal(action_result.set_status(phantom.APP_SUCCESS), self._state['oauth_token']['access_token'])
-            except KeyError:
-                self.debug_print("Key Error")
+        """ This method returns an OAuth token which stays valid for longer than the expiry skew. The token is
+        refreshed ahead of its expiry and shared with the other connector processes of the asset through a
+        lock-protected token cache.
+        :param action_result: Action result object
+        :param force_new: Whether the current token was rejected and a new one is required
+        :return: status phantom.APP_SUCCESS/phantom.APP_ERROR (along with appropriate message), access token
+        """
+
+        token_info = {'oauth_token': self._state.get('oauth_token'), 'retrieval_time': self._state.get('retrieval_time')}
+        if not force_new and self._is_oauth_token_fresh(token_info):
+            self.debug_print("Using old OAuth Token")
+            return RetVal(action_result.set_status(phantom.APP_SUCCESS), token_info['oauth_token']['access_token'])
+
+        rejected_token = (token_info['oauth_token'] or {}).get('access_token') if force_new else None
+
+        with self._oauth_lock, self._oauth_cache_lock():
+
+            # Another thread or connector process may have refreshed the token while waiting for the lock
+            cached = self._read_oauth_cache()
+            if cached.get('oauth_token'):
+                self._state['oauth_token'] = cached['oauth_token']
+                self._state['retrieval_time'] = cached.get('retrieval_time')
+                if self._is_oauth_token_fresh(cached) and cached['oauth_token'].get('access_token') != rejected_token:
+                    self.debug_print("Using the OAuth Token of the shared token cache")
+                    return RetVal(action_result.set_status(phantom.APP_SUCCESS), cached['oauth_token']['access_token'])
+
+            self.debug_print("Generating new OAuth Token")
+            start_time = time.time()
+            ret_val, access_token = self._get_new_oauth_token(action_result)
+            latency = time.time() - start_time
+            if phantom.is_fail(ret_val):
+                return RetVal(action_result.get_status(), None)
+
+            metrics = self._state.setdefault('oauth_metrics', {'refresh_count': 0, 'total_refresh_latency': 0})
+            metrics['refresh_count'] += 1
+            metrics['last_refresh_latency'] = round(latency, 3)
+            metrics['total_refresh_latency'] = round(metrics['total_refresh_latency'] + latency, 3)
+            self.debug_print("OAuth Token refreshed in {0:.3f} seconds, {1} refresh(es) so far".format(
+                latency, metrics['refresh_count']))
 
-        self.debug_print("Generating new OAuth Token")
-        return self._get_new_oauth_token(action_result)
+            self._write_oauth_cache({'oauth_token': self._state['oauth_token'], 'retrieval_time': self._state['retrieval_time']})
+
+        return RetVal(phantom.APP_SUCCESS, access_token)
 
     def _get_authorization_credentials(self, action_result, force_new=False):
         auth = None
@@ -565,7 +1074,7 @@ class ServicenowConnector(BaseConnector):
         request_str = '{0}{1}"{2}"{3}"{4}"{5}'.format(self.get_phantom_base_url(), uri, sdi, filter, label, prefix)
 
         try:
-            r = requests.get(request_str, verify=False)   # nosemgrep
+            r = self._session.get(request_str, verify=False, timeout=self._timeout)   # nosemgrep
         except Exception as e:
             self.debug_print("Error making local rest call: {0}".format(self._get_error_message_from_exception(e)))
             return 0, None, None, None
@@ -592,6 +1101,49 @@ class ServicenowConnector(BaseConnector):
             self.debug_print(resp_json)
         return 0, None, None, None
 
+    def _get_existing_containers(self, sdis, label):
+        """ This method looks up the existing containers of many source data identifiers with a few
+        local REST calls, instead of one call per source data identifier.
+        :param sdis: List of source data identifiers
+        :param label: Label of the containers
+        :return: dictionary of SDI to (container ID, label, name, description) of the oldest container,
+            None in case of failure
+        """
+
+        containers = dict()
+        request_url = '{0}rest/container'.format(self.get_phantom_base_url())
+
+        for i in range(0, len(sdis), SERVICENOW_CONTAINER_LOOKUP_CHUNK_SIZE):
+            chunk = sdis[i:i + SERVICENOW_CONTAINER_LOOKUP_CHUNK_SIZE]
+            params = {
+                'page_size': 0,
+                '_filter_source_data_identifier__in': json.dumps(chunk, separators=(',', ':')),
+                '_filter_label': '"{0}"'.format(label),
+                'sort': 'create_time',
+                'order': 'asc'
+            }
+
+            try:
+                r = self._session.get(request_url, params=params, verify=False, timeout=self._timeout)   # nosemgrep
+                resp_json = r.json()
+            except Exception as e:
+                self.debug_print("Error looking up the existing containers: {0}".format(self._get_error_message_from_exception(e)))
+                return None
+
+            if resp_json.get('failed') or 'data' not in resp_json:
+                self.debug_print('Something went wrong looking up the existing containers')
+                self.debug_print(resp_json)
+                return None
+
+            # Containers are sorted by creation time, so the oldest one of every SDI is kept
+            for container in resp_json['data']:
+                sdi = container.get('source_data_identifier')
+                if sdi not in containers:
+                    containers[sdi] = (container['id'], container['label'], container['name'], container['description'])
+
+        self.debug_print('{0} existing container(s) found for {1} SDI(s)'.format(len(containers), len(sdis)))
+        return containers
+
     def _test_connectivity(self, param):
 
         action_result = self.add_action_result(ActionResult(dict(param)))
@@ -648,6 +1200,29 @@ class ServicenowConnector(BaseConnector):
 
         return RetVal(phantom.APP_SUCCESS, fields)
 
+    def _get_sysparm_fields(self, fields, required_fields=None):
+        """ This method builds the value of the sysparm_fields parameter from a comma-separated list of fields.
+        The fields required by the app are always added to the projection.
+        :param fields: Comma-separated list of fields
+        :param required_fields: List of the fields the action requires on top of the ones required by the app
+        :return: value of sysparm_fields, None if all the fields have to be fetched
+        """
+
+        if not fields:
+            return None
+
+        fields = [field.strip() for field in self._handle_py_ver_compat_for_input_str(fields).split(',')]
+        fields = [field for field in fields if field]
+        if not fields:
+            return None
+
+        projection = list(SERVICENOW_MANDATORY_FIELDS)
+        for field in (required_fields or []) + fields:
+            if field not in projection:
+                projection.append(field)
+
+        return ','.join(projection)
+
     def _create_ticket(self, param):
 
         action_result = self.add_action_result(ActionResult(dict(param)))
@@ -711,21 +1286,14 @@ class ServicenowConnector(BaseConnector):
 
         action_result.update_summary({SERVICENOW_JSON_NEW_TICKET_ID: created_ticket_id})
 
-        vault_id = param.get(SERVICENOW_JSON_VAULT_ID)
+        vault_ids = self._get_vault_ids(param.get(SERVICENOW_JSON_VAULT_ID))
 
-        if vault_id:
-            self.save_progress("Attaching file to the ticket")
+        if vault_ids:
+            self.save_progress("Attaching files to the ticket")
 
-            try:
-                vault_process, response = self._add_attachment(action_result, table, created_ticket_id, vault_id)
-            except Exception as e:
-                error_msg = self._get_error_message_from_exception(e)
-                return action_result.set_status(phantom.APP_ERROR, "Invalid Vault ID, please enter valid Vault ID. {}".format(error_msg))
-            if phantom.is_success(vault_process):
-                action_result.update_summary({'attachment_added': True, 'attachment_id': response['result']['sys_id']})
-            else:
-                action_result.update_summary({'attachment_added': False, 'attachment_error': action_result.get_message()})
-                self.debug_print(action_result.get_message())
+            # The ticket was just created, so it has no attachment to compare the files with
+            results = self._add_attachments(action_result, table, created_ticket_id, vault_ids, check_existing=False)
+            self._update_attachment_summary(action_result, results, 'attachment_error')
 
         ret_val = self._get_ticket_details(action_result,
                         param.get(SERVICENOW_JSON_TABLE, SERVICENOW_DEFAULT_TABLE), created_ticket_id)
@@ -735,7 +1303,144 @@ class ServicenowConnector(BaseConnector):
 
         return action_result.set_status(phantom.APP_SUCCESS)
 
-    def _add_attachment(self, action_result, table, ticket_id, vault_id):
+    def _add_attachments(self, action_result, table, ticket_id, vault_ids, check_existing=True):
+        """ This method attaches the given vault files to a ticket, uploading them concurrently. The files whose SHA-256
+        matches the one of an attachment of the ticket, or of another of the files, are skipped.
+        :param action_result: Action result object
+        :param table: Name of the table
+        :param ticket_id: sys_id of the ticket
+        :param vault_ids: List of vault IDs
+        :param check_existing: Whether to look up the existing attachments of the ticket
+        :return: list of dictionaries with the vault_id, file_name, status ('uploaded', 'skipped' or 'failed'),
+            attachment_id and message of every file
+        """
+
+        results = list()
+        files = list()
+        for vault_id in vault_ids:
+            result = {'vault_id': vault_id}
+            results.append(result)
+
+            # Check for file in vault
+            try:
+                success, message, file_info = phrules.vault_info(vault_id=vault_id)
+                file_info = list(file_info)[0]
+            except IndexError:
+                result.update({'status': 'failed', 'message': "Vault file could not be found with supplied Vault ID"})
+                continue
+            except Exception as e:
+                error_msg = self._get_error_message_from_exception(e)
+                result.update({'status': 'failed', 'message': "Invalid Vault ID, please enter valid Vault ID. {}".format(error_msg)})
+                continue
+
+            result['file_name'] = file_info.get('name', vault_id)
+            try:
+                file_hash = self._get_vault_file_sha256(file_info)
+            except Exception as e:
+                self.debug_print("Error reading the file", e)
+                result.update({'status': 'failed', 'message': "Failed to read file from Vault"})
+                continue
+
+            files.append((result, file_info, file_hash))
+
+        existing_hashes = set()
+        if check_existing and files:
+            existing_hashes = self._get_attachment_hashes(table, ticket_id)
+
+        uploads = list()
+        for result, file_info, file_hash in files:
+            if file_hash in existing_hashes:
+                result.update({'status': 'skipped', 'message': "A file with the same SHA-256 is already attached to the ticket"})
+                continue
+            existing_hashes.add(file_hash)
+            uploads.append((result, file_info))
+
+        if uploads:
+            self.save_progress("Uploading {0} file(s)".format(len(uploads)))
+
+            # Every upload gets its own action result, so that the failure of a file does not fail the others
+            with ThreadPoolExecutor(max_workers=min(len(uploads), SERVICENOW_ATTACHMENT_UPLOAD_CONCURRENCY)) as executor:
+                futures = list()
+                for result, file_info in uploads:
+                    upload_result = ActionResult()
+                    future = executor.submit(self._add_attachment, upload_result, table, ticket_id, result['vault_id'], file_info)
+                    futures.append((result, upload_result, future))
+
+            for result, upload_result, future in futures:
+                try:
+                    ret_val, response = future.result()
+                except Exception as e:
+                    error_msg = self._get_error_message_from_exception(e)
+                    result.update({'status': 'failed', 'message': "Invalid Vault ID, please enter valid Vault ID. {}".format(error_msg)})
+                    continue
+
+                if phantom.is_success(ret_val):
+                    result.update({'status': 'uploaded', 'attachment_id': response['result']['sys_id']})
+                else:
+                    result.update({'status': 'failed', 'message': upload_result.get_message()})
+
+        return results
+
+    def _get_vault_file_sha256(self, file_info):
+        """ This method returns the SHA-256 of a vault file, from the vault metadata when available.
+        :param file_info: Dictionary of the vault file info
+        :return: hex digest of the SHA-256 of the file
+        """
+
+        file_hash = (file_info.get('metadata') or {}).get('sha256')
+        if file_hash:
+            return file_hash.lower()
+
+        sha256 = hashlib.sha256()
+        with open(file_info.get('path'), 'rb') as file_obj:
+            for block in iter(partial(file_obj.read, SERVICENOW_HASH_BLOCK_SIZE), b''):
+                sha256.update(block)
+
+        return sha256.hexdigest()
+
+    def _get_attachment_hashes(self, table, ticket_id):
+        """ This method returns the SHA-256 of the attachments of a ticket.
+        :param table: Name of the table
+        :param ticket_id: sys_id of the ticket
+        :return: set of the hex digests, empty if the attachments could not be listed
+        """
+
+        hashes = set()
+        payload = {'sysparm_query': 'table_name={0}^table_sys_id={1}'.format(table, ticket_id), 'sysparm_fields': 'hash'}
+        for ret_val, attachments in self._paginator('/attachment', ActionResult(), payload=payload):
+            if phantom.is_fail(ret_val):
+                self.debug_print("Unable to list the attachments of the ticket with sys ID: {0}".format(ticket_id))
+                return hashes
+
+            hashes.update(attachment['hash'].lower() for attachment in attachments if attachment.get('hash'))
+
+        return hashes
+
+    def _update_attachment_summary(self, action_result, results, error_key):
+        """ This method adds the outcome of the attachment uploads to the summary of the action.
+        :param action_result: Action result object
+        :param results: List of the per file results, as returned by _add_attachments
+        :param error_key: Summary key of the first failure message
+        :return: None
+        """
+
+        uploaded = [result for result in results if result['status'] == 'uploaded']
+        failed = [result for result in results if result['status'] == 'failed']
+
+        summary = action_result.update_summary({})
+        summary['attachment_added'] = not failed
+        if uploaded:
+            summary['attachment_id'] = uploaded[0]['attachment_id']
+        if failed:
+            summary[error_key] = failed[0]['message']
+            for result in failed:
+                self.debug_print("Unable to attach the vault file {0}: {1}".format(result['vault_id'], result['message']))
+        summary['attachments_uploaded'] = len(uploaded)
+        summary['attachments_skipped'] = len(results) - len(uploaded) - len(failed)
+        summary['attachments_failed'] = len(failed)
+        summary['attachment_ids'] = [result['attachment_id'] for result in uploaded]
+
+    def _add_attachment(self, action_result, table, ticket_id, vault_id, file_info=None):
 
         if not vault_id:
             return (phantom.APP_SUCCESS, None)
@@ -745,13 +1450,14 @@ class ServicenowConnector(BaseConnector):
             return action_result.set_status(phantom.APP_ERROR, "Unable to get authorization credentials")
 
         # Check for file in vault
-        try:
-            success, message, file_info = phrules.vault_info(vault_id=vault_id)
-            file_info = list(file_info)[0]
-        except IndexError:
-            return action_result.set_status(phantom.APP_ERROR, "Vault file could not be found with supplied Vault ID"), None
-        except Exception:
-            return action_result.set_status(phantom.APP_ERROR, "Vault ID not valid"), None
+        if file_info is None:
+            try:
+                success, message, file_info = phrules.vault_info(vault_id=vault_id)
+                file_info = list(file_info)[0]
+            except IndexError:
+                return action_result.set_status(phantom.APP_ERROR, "Vault file could not be found with supplied Vault ID"), None
+            except Exception:
+                return action_result.set_status(phantom.APP_ERROR, "Vault ID not valid"), None
 
         filename = file_info.get('name', vault_id)
         filepath = file_info.get('path')
@@ -761,11 +1467,15 @@ class ServicenowConnector(BaseConnector):
         headers.update({'Content-Type': magic_str})
 
         try:
-            data = open(filepath, 'rb').read()
+            file_size = os.path.getsize(filepath)
         except Exception as e:
             self.debug_print("Error reading the file", e)
             return (action_result.set_status(phantom.APP_ERROR, "Failed to read file from Vault"), None)
 
+        if self._max_attachment_size and file_size > self._max_attachment_size * SERVICENOW_BYTES_PER_MB:
+            return (action_result.set_status(phantom.APP_ERROR, SERVICENOW_ERR_ATTACHMENT_SIZE.format(
+                file_name=filename, size=file_size, max_size=self._max_attachment_size)), None)
+
         # Was not detonated before
         self.save_progress('Uploading the file')
 
@@ -774,14 +1484,39 @@ class ServicenowConnector(BaseConnector):
                 'table_sys_id': ticket_id,
                 'file_name': filename}
 
-        ret_val, response = self._upload_file_helper(action_result, '/attachment/file',
-                                headers=headers, params=params, data=data, auth=auth)
+        def report_progress(uploaded, total):
+            self.send_progress(SERVICENOW_UPLOAD_PROGRESS.format(file_name=filename, uploaded=uploaded, total=total,
+                percentage=(100 * uploaded) // max(total, 1)))
+
+        # The file is streamed from the disk instead of being read into memory
+        try:
+            file_obj = open(filepath, 'rb')
+        except Exception as e:
+            self.debug_print("Error reading the file", e)
+            return (action_result.set_status(phantom.APP_ERROR, "Failed to read file from Vault"), None)
+
+        with file_obj:
+            data = UploadFileReader(file_obj, file_size, report_progress)
+            ret_val, response = self._upload_file_helper(action_result, '/attachment/file',
+                                    headers=headers, params=params, data=data, auth=auth)
 
         if phantom.is_fail(ret_val):
             return (action_result.get_status(), response)
 
         return (phantom.APP_SUCCESS, response)
 
+    def _get_vault_ids(self, vault_ids):
+        """ This method returns the unique vault IDs of a comma-separated list.
+        :param vault_ids: Comma-separated list of vault IDs
+        :return: list of vault IDs
+        """
+
+        if not vault_ids:
+            return []
+
+        vault_ids = self._handle_py_ver_compat_for_input_str(vault_ids)
+        return list(dict.fromkeys(vault_id.strip() for vault_id in vault_ids.split(',') if vault_id.strip()))
+
     def _update_ticket(self, param):
 
         action_result = self.add_action_result(ActionResult(dict(param)))
@@ -804,26 +1539,10 @@ class ServicenowConnector(BaseConnector):
             return action_result.set_status(phantom.APP_ERROR, "Unable to get authorization credentials")
 
         if not is_sys_id:
-            params = {'sysparm_query': 'number={0}'.format(ticket_id)}
-            endpoint = '/table/{0}'.format(table)
-            ret_val, response = self._make_rest_call_helper(action_result, endpoint, auth=auth, headers=headers, params=params)
-
+            ret_val, ticket_id = self._get_sys_id_from_number(action_result, table, ticket_id, auth, headers)
             if phantom.is_fail(ret_val):
                 return action_result.get_status()
 
-            if response.get("result"):
-                sys_id = response.get("result")[0].get("sys_id")
-
-                if not sys_id:
-                    return action_result.set_status(phantom.APP_ERROR,
-                                        "Unable to fetch the ticket SYS ID for the provided ticket number: {0}".format(ticket_id))
-
-                ticket_id = sys_id
-            else:
-                return action_result.set_status(phantom.APP_ERROR,
-                            "Please provide a valid Ticket Number in the 'id' parameter or check the 'is_sys_id' \
-                                parameter and provide a valid 'sys_id' in the 'id' parameter")
-
         endpoint = '/table/{0}/{1}'.format(table, ticket_id)
 
         ret_val, fields = self._get_fields(param, action_result)
@@ -831,9 +1550,9 @@ class ServicenowConnector(BaseConnector):
         if phantom.is_fail(ret_val):
             return action_result.get_status()
 
-        vault_id = param.get(SERVICENOW_JSON_VAULT_ID)
+        vault_ids = self._get_vault_ids(param.get(SERVICENOW_JSON_VAULT_ID))
 
-        if not fields and not vault_id:
+        if not fields and not vault_ids:
             return action_result.set_status(phantom.APP_ERROR, "Please specify at-least one of fields or vault_id parameter")
 
         if fields:
@@ -846,21 +1565,11 @@ class ServicenowConnector(BaseConnector):
 
             action_result.update_summary({'fields_updated': True})
 
-        if vault_id:
-            self.save_progress("Attaching file to the ticket")
-
-            try:
-                ret_val, response = self._add_attachment(action_result, table, ticket_id, vault_id)
-                action_result.update_summary({'attachment_added': ret_val})
-            except Exception as e:
-                error_msg = self._get_error_message_from_exception(e)
-                return action_result.set_status(phantom.APP_ERROR, "Invalid Vault ID, please enter \
-                                    valid Vault ID. {}".format(error_msg))
+        if vault_ids:
+            self.save_progress("Attaching files to the ticket")
 
-            if phantom.is_success(ret_val):
-                action_result.update_summary({'attachment_id': response['result']['sys_id']})
-            else:
-                action_result.update_summary({'vault_failure_reason': action_result.get_message()})
+            results = self._add_attachments(action_result, table, ticket_id, vault_ids)
+            self._update_attachment_summary(action_result, results, 'vault_failure_reason')
 
         ret_val = self._get_ticket_details(action_result, table, ticket_id)
 
@@ -869,6 +1578,141 @@ class ServicenowConnector(BaseConnector):
 
         return action_result.set_status(phantom.APP_SUCCESS)
 
+    def _get_sys_id_from_number(self, action_result, table, number, auth, headers):
+        """ This method returns the sys_id of the ticket with the given number. Ticket numbers never change once
+        assigned, so the sys_ids are kept in a bounded LRU cache in the state and only the cache misses are queried.
+        :param action_result: Action result object
+        :param table: Name of the table
+        :param number: Number of the ticket
+        :param auth: Authentication object
+        :param headers: Request headers
+        :return: status phantom.APP_SUCCESS/phantom.APP_ERROR (along with appropriate message), sys_id of the ticket
+        """
+
+        sys_id = self._get_cached_sys_id(table, number)
+        if sys_id:
+            return RetVal(phantom.APP_SUCCESS, sys_id)
+
+        params = {'sysparm_query': 'number={0}'.format(number), 'sysparm_fields': 'sys_id'}
+        endpoint = '/table/{0}'.format(table)
+        ret_val, response = self._make_rest_call_helper(action_result, endpoint, auth=auth, headers=dict(headers), params=params)
+
+        if phantom.is_fail(ret_val):
+            return RetVal(action_result.get_status(), None)
+
+        if not response.get("result"):
+            return RetVal(action_result.set_status(phantom.APP_ERROR, "Please provide a valid Ticket Number in the \
+                'id' parameter or check the 'is_sys_id' parameter and provide a valid 'sys_id' in the 'id' parameter"), None)
+
+        sys_id = response.get("result")[0].get("sys_id")
+        if not sys_id:
+            return RetVal(action_result.set_status(phantom.APP_ERROR,
+                                "Unable to fetch the ticket SYS ID for the provided ticket number: {0}".format(number)), None)
+
+        self._cache_sys_id(table, number, sys_id)
+
+        return RetVal(phantom.APP_SUCCESS, sys_id)
+
+    def _get_sys_ids_from_numbers(self, action_result, table, numbers):
+        """ This method returns the sys_ids of the tickets with the given numbers, the numbers missing from the
+        cache are resolved with one numberIN query per chunk of numbers.
+        :param action_result: Action result object
+        :param table: Name of the table
+        :param numbers: List of ticket numbers
+        :return: status phantom.APP_SUCCESS/phantom.APP_ERROR (along with appropriate message),
+            dictionary of ticket number to sys_id, the unknown numbers are left out
+        """
+
+        sys_ids = dict()
+        missing = dict()
+        for number in dict.fromkeys(numbers):
+            sys_id = self._get_cached_sys_id(table, number)
+            if sys_id:
+                sys_ids[number] = sys_id
+            else:
+                # ServiceNow matches the numbers regardless of their case
+                missing.setdefault(number.lower(), []).append(number)
+
+        if not missing:
+            return RetVal(phantom.APP_SUCCESS, sys_ids)
+
+        ret_val, records = self._get_records_by_values(action_result, '/table/{0}'.format(table), 'number',
+                                    [spellings[0] for spellings in missing.values()], fields='sys_id,number')
+        if phantom.is_fail(ret_val):
+            return RetVal(action_result.get_status(), None)
+
+        for record in records:
+            if not record.get('number') or not record.get('sys_id'):
+                continue
+            for number in missing.get(record['number'].lower(), []):
+                sys_ids[number] = record['sys_id']
+            self._cache_sys_id(table, record['number'], record['sys_id'])
+
+        return RetVal(phantom.APP_SUCCESS, sys_ids)
+
+    def _get_cached_sys_id(self, table, number):
+        """ This method returns the cached sys_id of a ticket number and marks it as the most recently used one.
+        :param table: Name of the table
+        :param number: Number of the ticket
+        :return: sys_id of the ticket, None if the number is not cached
+        """
+
+        if not self._sys_id_cache_size:
+            return None
+
+        key = '{0}:{1}'.format(table, number.lower())
+
+        with self._poll_lock:
+            store = self._state.get('sys_ids')
+            if store and key in store:
+                # The store keeps the insertion order, re-inserting an entry moves it to the end
+                sys_id = store.pop(key)
+                store[key] = sys_id
+                self._sys_id_cache_stats['hits'] += 1
+                return sys_id
+            self._sys_id_cache_stats['misses'] += 1
+
+        return None
+
+    def _cache_sys_id(self, table, number, sys_id):
+        """ This method caches the sys_id of a ticket number, evicting the least recently used entries once the cache is full.
+        :param table: Name of the table
+        :param number: Number of the ticket
+        :param sys_id: sys_id of the ticket
+        :return: None
+        """
+
+        if not self._sys_id_cache_size:
+            return
+
+        key = '{0}:{1}'.format(table, number.lower())
+
+        with self._poll_lock:
+            store = self._state.setdefault('sys_ids', dict())
+            store.pop(key, None)
+            store[key] = sys_id
+            while len(store) > self._sys_id_cache_size:
+                del store[next(iter(store))]
+
+    def _evict_stale_sys_id(self, endpoint):
+        """ This method drops the cached ticket numbers resolving to the record of an endpoint the instance did not find,
+        so that the next lookup of a deleted or renumbered ticket queries its number again.
+        :param endpoint: REST endpoint of the request, only the /table/<table>/<sys_id> record endpoints are considered
+        :return: None
+        """
+
+        parts = endpoint.split('/')
+        if len(parts) != 4 or parts[1] != 'table':
+            return
+
+        prefix = '{0}:'.format(parts[2])
+        with self._poll_lock:
+            store = self._state.get('sys_ids')
+            if not store:
+                return
+            for key in [key for key, sys_id in store.items() if sys_id == parts[3] and key.startswith(prefix)]:
+                del store[key]
+
     def _get_ticket_details(self, action_result, table, sys_id, is_sys_id=True):
 
         ret_val, auth, headers = self._get_authorization_credentials(action_result)
@@ -876,42 +1720,44 @@ class ServicenowConnector(BaseConnector):
             return action_result.set_status(phantom.APP_ERROR, "Unable to get authorization credentials")
 
         if not is_sys_id:
-            params = {'sysparm_query': 'number={0}'.format(sys_id)}
-            endpoint = '/table/{0}'.format(table)
-            ret_val, response = self._make_rest_call_helper(action_result, endpoint, auth=auth, headers=headers, params=params)
-
+            ret_val, sys_id = self._get_sys_id_from_number(action_result, table, sys_id, auth, headers)
             if phantom.is_fail(ret_val):
                 return action_result.get_status()
 
-            if response.get("result"):
-                sys_id = response.get("result")[0].get("sys_id")
-
-                if not sys_id:
-                    return action_result.set_status(phantom.APP_ERROR, "Unable to fetch the ticket SYS ID \
-                                    for the provided ticket number: {0}".format(sys_id))
-
-            else:
-                return action_result.set_status(phantom.APP_ERROR, "Please provide a valid Ticket Number in the \
-                    'id' parameter or check the 'is_sys_id' parameter and provide a valid 'sys_id' in the 'id' parameter")
+        # Once the sys_id is known, the record, its attachments and its journal entries do not depend on
+        # each other and are fetched concurrently. Every request gets its own action result, so that only
+        # the failure of the record fetch fails the action
+        record_result = ActionResult()
+        attachment_result = ActionResult()
+        journal_result = ActionResult()
 
         endpoint = '/table/{0}/{1}'.format(table, sys_id)
+        attachment_params = {'sysparm_query': 'table_sys_id={0}'.format(sys_id)}
+        journal_params = {}
+        journal_params["element_id"] = sys_id
+        journal_params["sysparm_query"] = "element=comments^ORelement=work_notes"
 
-        ret_val, response = self._make_rest_call_helper(action_result, endpoint, auth=auth, headers=headers)
+        with ThreadPoolExecutor(max_workers=SERVICENOW_TICKET_DETAILS_CONCURRENCY) as executor:
+            record_future = executor.submit(self._make_rest_call_helper, record_result, endpoint,
+                                auth=auth, headers=dict(headers))
+            attachment_future = executor.submit(self._make_rest_call_helper, attachment_result, '/attachment',
+                                auth=auth, headers=dict(headers), params=attachment_params)
+            journal_future = executor.submit(self._make_rest_call_helper, journal_result, "/table/sys_journal_field",
+                                auth=auth, headers=dict(headers), params=journal_params)
+
+        ret_val, response = record_future.result()
 
         if phantom.is_fail(ret_val):
-            self.debug_print(action_result.get_message())
-            action_result.set_status(phantom.APP_ERROR, action_result.get_message())
+            self.debug_print(record_result.get_message())
+            action_result.set_status(phantom.APP_ERROR, record_result.get_message())
             return phantom.APP_ERROR
 
         ticket = response['result']
 
         ticket_sys_id = ticket['sys_id']
 
-        params = {'sysparm_query': 'table_sys_id={0}'.format(ticket_sys_id)}
-
         # get the attachment details
-        ret_val, attach_resp = self._make_rest_call_helper(action_result, '/attachment',
-                            auth=auth, headers=headers, params=params)
+        ret_val, attach_resp = attachment_future.result()
 
         # is some versions of servicenow fail the attachment query if not present
         # some pass it with no data if not present, so only add data if present and valid
@@ -922,17 +1768,12 @@ class ServicenowConnector(BaseConnector):
             except:
                 pass
 
-        endpoint = "/table/sys_journal_field"
-
-        params = {}
-        params["element_id"] = sys_id
-        params["sysparm_query"] = "element=comments^ORelement=work_notes"
-        ret_val, response = self._make_rest_call_helper(action_result, endpoint,
-                                auth=auth, headers=headers, params=params)
+        ret_val, response = journal_future.result()
 
         if phantom.is_fail(ret_val):
             self.debug_print("Unable to fetch comments and work_notes for \
-                    the ticket with sys ID: {0}. Details: {1}".format(ticket_sys_id, action_result.get_message()))
+                    the ticket with sys ID: {0}. Details: {1}".format(ticket_sys_id, journal_result.get_message()))
+            response = {}
 
         comment_section = []
         worknotes_section = []
@@ -979,37 +1820,286 @@ class ServicenowConnector(BaseConnector):
 
         return action_result.set_status(phantom.APP_SUCCESS)
 
-    def _paginator(self, endpoint, action_result, payload=None, limit=None):
+    def _get_tickets(self, param):
 
-        ret_val, auth, headers = self._get_authorization_credentials(action_result)
+        action_result = self.add_action_result(ActionResult(dict(param)))
+
+        # Progress
+        self.save_progress(SERVICENOW_USING_BASE_URL, base_url=self._base_url)
+
+        # Connectivity
+        self.save_progress(phantom.APP_PROG_CONNECTING_TO_ELLIPSES, self._host)
+
+        try:
+            table_name = self._handle_py_ver_compat_for_input_str(param.get(SERVICENOW_JSON_TABLE, SERVICENOW_DEFAULT_TABLE))
+            ticket_ids = self._handle_py_ver_compat_for_input_str(param[SERVICENOW_JSON_TICKET_IDS])
+            is_sys_id = param.get("is_sys_id", False)
+        except:
+            return action_result.set_status(phantom.APP_ERROR, "Please provide valid input parameters")
+
+        # ServiceNow matches the numbers and sys_ids regardless of their case, the IDs are matched in lowercase
+        unique_ids = dict()
+        for ticket_id in ticket_ids.split(','):
+            if ticket_id.strip():
+                unique_ids.setdefault(ticket_id.strip().lower(), ticket_id.strip())
+        ticket_ids = list(unique_ids.values())
+        if not ticket_ids:
+            return action_result.set_status(phantom.APP_ERROR, SERVICENOW_ERR_TICKET_IDS)
+
+        # The tickets, their attachments and their journal entries are each fetched with one query per chunk of IDs
+        id_field = 'sys_id' if is_sys_id else 'number'
+        ret_val, records = self._get_records_by_values(action_result, '/table/{0}'.format(table_name), id_field, ticket_ids)
         if phantom.is_fail(ret_val):
-            action_result.set_status("Unable to get authorization credentials")
-            return None
+            return action_result.get_status()
+
+        tickets = dict()
+        for record in records:
+            if not record.get(id_field) or record[id_field].lower() in tickets or not record.get('sys_id'):
+                continue
+            tickets[record[id_field].lower()] = record
+            if not is_sys_id:
+                self._cache_sys_id(table_name, record[id_field], record['sys_id'])
+
+        sys_ids = [ticket['sys_id'] for ticket in tickets.values()]
+
+        attachments = None
+        attachment_result = ActionResult()
+        ret_val, records = self._get_records_by_values(attachment_result, '/attachment', 'table_sys_id', sys_ids)
+
+        # is some versions of servicenow fail the attachment query if not present
+        # some pass it with no data if not present, so only add data if present and valid
+        if phantom.is_success(ret_val):
+            attachments = dict()
+            for attachment in records:
+                attachments.setdefault(attachment.get('table_sys_id'), []).append(attachment)
 
-        items_list = list()
-        if not payload:
-            payload = dict()
+        journals = dict()
+        journal_result = ActionResult()
+        ret_val, records = self._get_records_by_values(journal_result, '/table/sys_journal_field', 'element_id', sys_ids,
+                                    query='element=comments^ORelement=work_notes')
 
-        payload['sysparm_offset'] = SERVICENOW_DEFAULT_OFFSET
-        payload['sysparm_limit'] = SERVICENOW_DEFAULT_LIMIT
+        if phantom.is_fail(ret_val):
+            self.debug_print("Unable to fetch comments and work_notes for the tickets. Details: {0}".format(
+                journal_result.get_message()))
+            records = []
+
+        for item in records:
+            journals.setdefault(item.get('element_id'), []).append(item)
+
+        for ticket_id in ticket_ids:
+            ticket = tickets.get(ticket_id.lower())
+            if not ticket:
+                continue
+
+            if attachments is not None:
+                ticket['attachment_details'] = attachments.get(ticket['sys_id'], [])
+
+            comment_section = []
+            worknotes_section = []
+            for item in journals.get(ticket['sys_id'], []):
+                if item['element'] == "comments":
+                    comment_section.append(item.get("value", ""))
+                elif item['element'] == "work_notes":
+                    worknotes_section.append(item.get("value", ""))
+
+            ticket['comments_section'] = comment_section
+            ticket['worknotes_section'] = worknotes_section
+
+            action_result.add_data(ticket)
+
+        summary = action_result.update_summary({})
+        summary['tickets_found'] = len(tickets)
+        summary['tickets_not_found'] = [ticket_id for ticket_id in ticket_ids if ticket_id.lower() not in tickets]
+
+        if not tickets:
+            return action_result.set_status(phantom.APP_ERROR, SERVICENOW_ERR_NO_TICKETS_FOUND)
+
+        return action_result.set_status(phantom.APP_SUCCESS)
+
+    def _get_records_by_values(self, action_result, endpoint, field, values, query=None, fields=None):
+        """ This method fetches the records of the given endpoint whose field has one of the given values,
+        with one IN query per chunk of values.
+        :param action_result: Action result object
+        :param endpoint: REST endpoint to fetch the records from
+        :param field: Name of the field to match
+        :param values: List of the values to match
+        :param query: Encoded query to further filter the records with
+        :param fields: Comma-separated list of the fields to fetch, all the fields are fetched if not provided
+        :return: status phantom.APP_SUCCESS/phantom.APP_ERROR (along with appropriate message), list of records
+        """
+
+        records = list()
+        for i in range(0, len(values), SERVICENOW_SYS_ID_CHUNK_SIZE):
+            chunk = values[i:i + SERVICENOW_SYS_ID_CHUNK_SIZE]
+            payload = {'sysparm_query': '{0}IN{1}'.format(field, ','.join(chunk))}
+            if query:
+                payload['sysparm_query'] = '{0}^{1}'.format(payload['sysparm_query'], query)
+            if fields:
+                payload['sysparm_fields'] = fields
+
+            for ret_val, items in self._paginator(endpoint, action_result, payload=payload):
+                if phantom.is_fail(ret_val):
+                    return RetVal(action_result.get_status(), None)
+
+                records.extend(items)
+
+        return RetVal(phantom.APP_SUCCESS, records)
+
+    def _build_keyset_query(self, query, last_record=None):
+        """ This method builds the encoded query of a keyset page. The records are ordered by sys_updated_on
+        and sys_id and only the records placed after the last record of the previous page are requested.
+        :param query: Encoded query to filter the records with
+        :param last_record: Last record of the previous page, None for the first page
+        :return: encoded query
+        """
+
+        if last_record is None:
+            clauses = [query] if query else []
+        else:
+            updated_on = last_record['sys_updated_on']
+            sys_id = last_record['sys_id']
+            clauses = [
+                self._add_query_condition(query, 'sys_updated_on>{}'.format(updated_on)),
+                self._add_query_condition(query, 'sys_updated_on={}^sys_id>{}'.format(updated_on, sys_id))]
+
+        clauses = '^NQ'.join(clauses)
+        if clauses:
+            return '{}^{}'.format(clauses, SERVICENOW_KEYSET_ORDER)
+        return SERVICENOW_KEYSET_ORDER
+
+    def _add_query_condition(self, query, condition):
+        """ This method adds a condition to an encoded query. Every '^NQ' separated branch of the query
+        gets its own copy of the condition, so that the condition applies to all of them.
+        :param query: Encoded query
+        :param condition: Encoded condition to add
+        :return: encoded query
+        """
+
+        if not query:
+            return condition
+
+        return '^NQ'.join('{}^{}'.format(branch, condition) if branch else condition for branch in query.split('^NQ'))
+
+    def _prefetch_pages(self, endpoint, action_result, payload, auth, headers, offset, total, concurrency):
+        """ This method fetches the offset windows of a paginated query between offset and total concurrently.
+        At most concurrency pages are requested or waiting to be consumed at any time.
+        :param endpoint: REST endpoint to fetch the records from
+        :param action_result: Action result object
+        :param payload: Request parameters
+        :param auth: Authentication object
+        :param headers: Request headers
+        :param offset: Offset of the first window to fetch
+        :param total: Offset at which to stop fetching
+        :param concurrency: Maximum number of pages fetched at the same time
+        :return: generator of RetVal(status, list of records) in the offset order, it stops after the first failure
+        """
+
+        windows = iter(range(offset, total, SERVICENOW_DEFAULT_LIMIT))
+
+        def fetch_window(window_offset):
+            params = dict(payload)
+            params['sysparm_offset'] = window_offset
+            params['sysparm_limit'] = min(SERVICENOW_DEFAULT_LIMIT, total - window_offset)
+            return self._make_rest_call_helper(action_result, endpoint, auth=auth, headers=dict(headers), params=params)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = deque()
+            for window_offset in windows:
+                pending.append(executor.submit(fetch_window, window_offset))
+                if len(pending) >= concurrency:
+                    break
+
+            while pending:
+                ret_val, response = pending.popleft().result()
+
+                if phantom.is_fail(ret_val):
+                    for future in pending:
+                        future.cancel()
+                    yield RetVal(action_result.get_status(), None)
+                    return
+
+                # Keep the pool busy while the caller consumes the page
+                window_offset = next(windows, None)
+                if window_offset is not None:
+                    pending.append(executor.submit(fetch_window, window_offset))
+
+                yield RetVal(phantom.APP_SUCCESS, response.get("result", []))
+
+    def _paginator(self, endpoint, action_result, payload=None, limit=None, keyset=False, concurrency=1, start_after=None):
+        """ This method fetches the records of the given endpoint one page at a time.
+        Every page is sized from the number of records still required to reach the limit
+        and is yielded as soon as it arrives, so only a single page is held in memory.
+        :param endpoint: REST endpoint to fetch the records from
+        :param action_result: Action result object
+        :param payload: Request parameters
+        :param limit: Maximum number of records to fetch, all the records are fetched if not provided
+        :param keyset: Whether to page on (sys_updated_on, sys_id) instead of the offset, the filter
+            in sysparm_query must not contain any ORDERBY clause in that case
+        :param concurrency: Number of offset pages to fetch concurrently once the first page gave the
+            X-Total-Count of the query, ignored in keyset mode
+        :param start_after: Dictionary with the sys_updated_on and sys_id of the record to resume after in keyset mode
+        :return: generator of RetVal(status, list of records), it stops after the first failure
+        """
+
+        ret_val, auth, headers = self._get_authorization_credentials(action_result)
+        if phantom.is_fail(ret_val):
+            yield RetVal(action_result.set_status(phantom.APP_ERROR, "Unable to get authorization credentials"), None)
+            return
+
+        payload = dict(payload) if payload else dict()
+        query = payload.get('sysparm_query', '')
+        offset = SERVICENOW_DEFAULT_OFFSET
+        last_record = start_after if keyset else None
+        fetched = 0
 
         while True:
-            ret_val, items = self._make_rest_call_helper(action_result, endpoint, auth=auth, headers=headers, params=payload)
+            page_size = SERVICENOW_DEFAULT_LIMIT
+            if limit:
+                page_size = min(page_size, limit - fetched)
+
+            if keyset:
+                try:
+                    payload['sysparm_query'] = self._build_keyset_query(query, last_record)
+                except KeyError:
+                    yield RetVal(action_result.set_status(phantom.APP_ERROR,
+                                    "Unable to page through the records without their sys_updated_on and sys_id"), None)
+                    return
+            else:
+                payload['sysparm_offset'] = offset
+            payload['sysparm_limit'] = page_size
+
+            response_headers = dict()
+            ret_val, response = self._make_rest_call_helper(action_result, endpoint, auth=auth, headers=headers, params=payload,
+                                        response_headers=response_headers)
 
             if phantom.is_fail(ret_val):
-                return None
+                yield RetVal(action_result.get_status(), None)
+                return
 
-            items_list.extend(items.get("result"))
+            items = response.get("result", [])
+            fetched += len(items)
+            offset += len(items)
+            if items:
+                last_record = items[-1]
 
-            if limit and len(items_list) >= limit:
-                return items_list[:limit]
+            yield RetVal(phantom.APP_SUCCESS, items)
 
-            if len(items.get("result")) < SERVICENOW_DEFAULT_LIMIT:
-                break
+            if len(items) < page_size or (limit and fetched >= limit):
+                return
+
+            if concurrency > 1 and not keyset:
+                try:
+                    total = int(response_headers['X-Total-Count'])
+                except (KeyError, ValueError):
+                    self.debug_print("X-Total-Count not available, fetching the pages sequentially")
+                    continue
 
-            payload['sysparm_offset'] = '{}{}'.format(payload['sysparm_offset'], SERVICENOW_DEFAULT_LIMIT)
+                if limit:
+                    total = min(total, limit)
 
-        return items_list
+                for page in self._prefetch_pages(endpoint, action_result, payload, auth, headers, offset, total, concurrency):
+                    yield page
+                return
 
     def _describe_service_catalog(self, param):
 
@@ -1100,7 +2190,7 @@ class ServicenowConnector(BaseConnector):
         limit = self._validate_integers(action_result, param.get(SERVICENOW_JSON_MAX_RESULTS,
                                 SERVICENOW_DEFAULT_MAX_LIMIT), SERVICENOW_JSON_MAX_RESULTS)
         if limit is None:
-            return action_result.get_status()
+            return RetVal(action_result.get_status(), None)
 
         payload = dict()
         catalog_sys_id = param.get("catalog_sys_id")
@@ -1128,12 +2218,14 @@ class ServicenowConnector(BaseConnector):
             search_query = '^'.join(query)
             payload["sysparm_query"] = search_query
 
-        services = self._paginator(endpoint, action_result, payload=payload, limit=limit)
+        services = list()
+        for ret_val, items in self._paginator(endpoint, action_result, payload=payload, limit=limit):
+            if phantom.is_fail(ret_val):
+                return RetVal(action_result.get_status(), None)
 
-        if services is None:
-            return action_result.get_status(), None
+            services.extend(items)
 
-        return phantom.APP_SUCCESS, services
+        return RetVal(phantom.APP_SUCCESS, services)
 
     def _list_services(self, param):
 
@@ -1176,13 +2268,12 @@ class ServicenowConnector(BaseConnector):
 
         endpoint = '/table/sc_category'
 
-        service_categories = self._paginator(endpoint, action_result, limit=limit)
-
-        if service_categories is None:
-            return action_result.get_status()
+        for ret_val, service_categories in self._paginator(endpoint, action_result, limit=limit):
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
 
-        for category in service_categories:
-            action_result.add_data(category)
+            for category in service_categories:
+                action_result.add_data(category)
 
         summary = action_result.update_summary({})
         summary['categories_returned'] = action_result.get_data_size()
@@ -1203,19 +2294,26 @@ class ServicenowConnector(BaseConnector):
 
         endpoint = '/table/sc_catalog'
 
-        service_catalogs = self._paginator(endpoint, action_result, limit=limit)
-
-        if service_catalogs is None:
-            return action_result.get_status()
+        for ret_val, service_catalogs in self._paginator(endpoint, action_result, limit=limit):
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
 
-        for sc in service_catalogs:
-            action_result.add_data(sc)
+            for sc in service_catalogs:
+                action_result.add_data(sc)
 
         summary = action_result.update_summary({})
         summary['service_catalogs_returned'] = action_result.get_data_size()
 
         return action_result.set_status(phantom.APP_SUCCESS)
 
+    def _unescape_journal_entry(self, entry):
+        """ This method replaces the escape sequences of a work note or comment with the characters they stand for.
+        :param entry: Text of the work note or comment
+        :return: unescaped text
+        """
+
+        return entry.replace("\\n", "\n").replace("\\'", "\'").replace('\\"', '\"').replace("\\b", "\b")
+
     def _add_work_note(self, param):
 
         action_result = self.add_action_result(ActionResult(dict(param)))
@@ -1235,29 +2333,14 @@ class ServicenowConnector(BaseConnector):
             return action_result.set_status(phantom.APP_ERROR, "Please provide valid input parameters")
 
         if not is_sys_id:
-            params = {'sysparm_query': 'number={0}'.format(sys_id)}
-            endpoint = '/table/{0}'.format(table_name)
-            ret_val, response = self._make_rest_call_helper(action_result, endpoint, auth=auth, headers=headers, params=params)
-
+            ret_val, sys_id = self._get_sys_id_from_number(action_result, table_name, sys_id, auth, headers)
             if phantom.is_fail(ret_val):
                 return action_result.get_status()
 
-            if response.get("result"):
-                new_sys_id = response.get("result")[0].get("sys_id")
-
-                if not new_sys_id:
-                    return action_result.set_status(phantom.APP_ERROR, "Unable to fetch the \
-                            ticket SYS ID for the provided ticket number: {0}".format(sys_id))
-
-                sys_id = new_sys_id
-            else:
-                return action_result.set_status(phantom.APP_ERROR, "Please provide a valid Ticket Number \
-                    in the 'id' parameter or check the 'is_sys_id' parameter and provide a valid 'sys_id' in the 'id' parameter")
-
         work_note = param.get("work_note")
 
         endpoint = "/table/{}/{}".format(table_name, sys_id)
-        data = {"work_notes": work_note.replace("\\n", "\n").replace("\\'", "\'").replace('\\"', '\"').replace("\\b", "\b")}
+        data = {"work_notes": self._unescape_journal_entry(work_note)}
 
         request_params = {}
         request_params["sysparm_display_value"] = True
@@ -1388,28 +2471,13 @@ class ServicenowConnector(BaseConnector):
             return action_result.set_status(phantom.APP_ERROR, "Please provide valid input parameters")
 
         if not is_sys_id:
-            params = {'sysparm_query': 'number={0}'.format(sys_id)}
-            endpoint = '/table/{0}'.format(table_name)
-            ret_val, response = self._make_rest_call_helper(action_result, endpoint, auth=auth, headers=headers, params=params)
-
+            ret_val, sys_id = self._get_sys_id_from_number(action_result, table_name, sys_id, auth, headers)
             if phantom.is_fail(ret_val):
                 return action_result.get_status()
 
-            if response.get("result"):
-                new_sys_id = response.get("result")[0].get("sys_id")
-
-                if not new_sys_id:
-                    return action_result.set_status(phantom.APP_ERROR, "Unable to fetch the ticket \
-                                    SYS ID for the provided ticket number: {0}".format(sys_id))
-
-                sys_id = new_sys_id
-            else:
-                return action_result.set_status(phantom.APP_ERROR, "Please provide a valid Ticket Number \
-                    in the 'id' parameter or check the 'is_sys_id' parameter and provide a valid 'sys_id' in the 'id' parameter")
-
         comment = param.get("comment")
         endpoint = "/table/{}/{}".format(table_name, sys_id)
-        data = {"comments": comment.replace("\\n", "\n").replace("\\'", "\'").replace('\\"', '\"').replace("\\b", "\b")}
+        data = {"comments": self._unescape_journal_entry(comment)}
 
         request_params = {}
         request_params["sysparm_display_value"] = True
@@ -1427,6 +2495,246 @@ class ServicenowConnector(BaseConnector):
 
         return action_result.set_status(phantom.APP_SUCCESS, "Added the comment successfully")
 
+    def _bulk_ticket_operation(self, param, operation):
+        """ This method runs the bulk variants of the create ticket, update ticket, add work note and add comment actions.
+        The operations are packed into Batch API requests, the results and the errors are reported per item.
+        :param param: Dictionary of input parameters
+        :param operation: Operation to run for every item, one of SERVICENOW_BULK_OPERATIONS
+        :return: status phantom.APP_SUCCESS/phantom.APP_ERROR (along with appropriate message)
+        """
+
+        action_result = self.add_action_result(ActionResult(dict(param)))
+
+        # Progress
+        self.save_progress(SERVICENOW_USING_BASE_URL, base_url=self._base_url)
+
+        # Connectivity
+        self.save_progress(phantom.APP_PROG_CONNECTING_TO_ELLIPSES, self._host)
+
+        try:
+            table = self._handle_py_ver_compat_for_input_str(param.get(SERVICENOW_JSON_TABLE, SERVICENOW_DEFAULT_TABLE))
+            operations = json.loads(param[SERVICENOW_JSON_OPERATIONS])
+            is_sys_id = param.get("is_sys_id", False)
+        except Exception as e:
+            error_msg = self._get_error_message_from_exception(e)
+            return action_result.set_status(phantom.APP_ERROR, SERVICENOW_ERR_OPERATIONS_JSON_PARSE.format(error_msg=error_msg))
+
+        if not operations or not isinstance(operations, list):
+            return action_result.set_status(phantom.APP_ERROR, SERVICENOW_ERR_OPERATIONS_LIST)
+
+        ret_val, auth, headers = self._get_authorization_credentials(action_result)
+        if phantom.is_fail(ret_val):
+            return action_result.set_status(phantom.APP_ERROR, "Unable to get authorization credentials")
+
+        # The ticket numbers of all the items are resolved upfront
+        sys_ids = dict()
+        if operation != 'create' and not is_sys_id:
+            numbers = [str(item['id']) for item in operations if isinstance(item, dict) and item.get('id')]
+            ret_val, sys_ids = self._get_sys_ids_from_numbers(action_result, table, numbers)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+
+        results = list()
+        bulk_requests = list()
+        for index, item in enumerate(operations):
+            result = {'index': index, 'id': item.get('id') if isinstance(item, dict) else None, 'success': False}
+            results.append(result)
+
+            ret_val, request = self._get_bulk_request(table, operation, item, sys_ids if not is_sys_id else None)
+            if phantom.is_fail(ret_val):
+                result['message'] = request
+                continue
+
+            result['sys_id'] = request['sys_id']
+            request['id'] = str(index)
+            bulk_requests.append(request)
+
+        responses = self._send_bulk_requests(action_result, bulk_requests, auth, headers)
+
+        for request in bulk_requests:
+            result = results[int(request['id'])]
+            success, response = responses[request['id']]
+            if not success:
+                result['message'] = response
+                continue
+
+            record = response.get('result', {}) if isinstance(response, dict) else {}
+            for field in ('work_notes', 'comments'):
+                if operation in ('work_note', 'comment') and isinstance(record.get(field), str):
+                    record[field] = record[field].replace("\n\n", "\n, ").strip(", ")
+
+            result.update({'success': True, 'sys_id': record.get('sys_id', result['sys_id']), 'result': record})
+            if operation == 'create':
+                result['id'] = record.get('number')
+
+        for result in results:
+            action_result.add_data(result)
+
+        succeeded = sum(1 for result in results if result['success'])
+        summary = action_result.update_summary({})
+        summary['total_operations'] = len(results)
+        summary['successful_operations'] = succeeded
+        summary['failed_operations'] = len(results) - succeeded
+        summary['batch_requests'] = self._bulk_stats['batch_requests']
+
+        message = "Completed {0} of {1} operations successfully".format(succeeded, len(results))
+        if not succeeded:
+            return action_result.set_status(phantom.APP_ERROR, message)
+
+        return action_result.set_status(phantom.APP_SUCCESS, message)
+
+    def _get_bulk_request(self, table, operation, item, sys_ids=None):
+        """ This method builds the request of one item of a bulk operation.
+        :param table: Name of the table
+        :param operation: Operation to run, one of SERVICENOW_BULK_OPERATIONS
+        :param item: Dictionary of the item
+        :param sys_ids: Dictionary of ticket number to sys_id, None if the IDs of the items are sys_ids
+        :return: status phantom.APP_SUCCESS/phantom.APP_ERROR, dictionary of the request or error message
+        """
+
+        if not isinstance(item, dict):
+            return RetVal(phantom.APP_ERROR, SERVICENOW_ERR_BULK_ITEM_TYPE)
+
+        if operation == 'create':
+            # Same check as the create ticket action, an empty item would create a blank ticket
+            if not item:
+                return RetVal(phantom.APP_ERROR, SERVICENOW_ERR_BULK_ITEM_NO_FIELDS)
+            data = dict(item)
+            data['description'] = '{0}\n\n{1}{2}'.format(
+                item.get('description', ''), SERVICENOW_TICKET_FOOTNOTE, self.get_container_id())
+            return RetVal(phantom.APP_SUCCESS, {
+                'sys_id': None, 'method': 'post', 'endpoint': '/table/{0}'.format(table), 'params': {}, 'data': data})
+
+        if not item.get('id'):
+            return RetVal(phantom.APP_ERROR, SERVICENOW_ERR_BULK_ITEM_KEY.format(key='id'))
+
+        sys_id = str(item['id'])
+        if sys_ids is not None:
+            sys_id = sys_ids.get(sys_id)
+            if not sys_id:
+                return RetVal(phantom.APP_ERROR, SERVICENOW_ERR_BULK_TICKET_NUMBER.format(number=item['id']))
+
+        params = {}
+        if operation == 'update':
+            data = item.get('fields')
+            if not data or not isinstance(data, dict):
+                return RetVal(phantom.APP_ERROR, SERVICENOW_ERR_BULK_ITEM_KEY.format(key='fields'))
+        else:
+            key, field = ('work_note', 'work_notes') if operation == 'work_note' else ('comment', 'comments')
+            if not item.get(key):
+                return RetVal(phantom.APP_ERROR, SERVICENOW_ERR_BULK_ITEM_KEY.format(key=key))
+            data = {field: self._unescape_journal_entry(str(item[key]))}
+            params['sysparm_display_value'] = True
+
+        return RetVal(phantom.APP_SUCCESS, {
+            'sys_id': sys_id, 'method': 'put', 'endpoint': '/table/{0}/{1}'.format(table, sys_id), 'params': params, 'data': data})
+
+    def _send_bulk_requests(self, action_result, bulk_requests, auth, headers):
+        """ This method sends the requests of a bulk operation, packed into Batch API requests. The requests are sent
+        individually by a bounded pool of threads instead when the Batch API is not available on the instance.
+        :param action_result: Action result object
+        :param bulk_requests: List of the requests, as returned by _get_bulk_request along with their ID
+        :param auth: Authentication object
+        :param headers: Request headers
+        :return: dictionary of request ID to (whether the request succeeded, response body or error message)
+        """
+
+        responses = dict()
+        for i in range(0, len(bulk_requests), SERVICENOW_BULK_BATCH_SIZE):
+            chunk = bulk_requests[i:i + SERVICENOW_BULK_BATCH_SIZE]
+            if self._bulk_stats['batch_api']:
+                responses.update(self._send_batch_request(action_result, chunk, auth, headers))
+
+            pending = [request for request in chunk if request['id'] not in responses]
+            if not pending:
+                continue
+
+            with ThreadPoolExecutor(max_workers=min(len(pending), SERVICENOW_BULK_CONCURRENCY)) as executor:
+                futures = [executor.submit(self._send_bulk_request, request, auth, headers) for request in pending]
+                for request, future in zip(pending, futures):
+                    responses[request['id']] = future.result()
+
+        return responses
+
+    def _send_batch_request(self, action_result, bulk_requests, auth, headers):
+        """ This method sends the given requests with a single Batch API request.
+        :param action_result: Action result object
+        :param bulk_requests: List of the requests, as returned by _get_bulk_request along with their ID
+        :param auth: Authentication object
+        :param headers: Request headers
+        :return: dictionary of request ID to (whether the request succeeded, response body or error message),
+            the requests which were not serviced are left out
+        """
+
+        request_headers = [{'name': 'Content-Type', 'value': 'application/json'}, {'name': 'Accept', 'value': 'application/json'}]
+        rest_requests = list()
+        for request in bulk_requests:
+            url = '{0}{1}'.format(self._api_uri, request['endpoint'])
+            if request['params']:
+                url = '{0}?{1}'.format(url, urlencode(request['params']))
+            rest_requests.append({
+                'id': request['id'],
+                'method': request['method'].upper(),
+                'url': url,
+                'headers': request_headers,
+                'body': base64.b64encode(json.dumps(request['data']).encode('utf-8')).decode('utf-8')})
+
+        data = {'batch_request_id': bulk_requests[0]['id'], 'rest_requests': rest_requests}
+        response_info = dict()
+        ret_val, response = self._make_rest_call_helper(action_result, SERVICENOW_BATCH_ENDPOINT, data=data, auth=auth,
+                                headers=dict(headers), method="post", response_info=response_info)
+
+        if phantom.is_fail(ret_val):
+            # The instance rejected the request itself, so the Batch API is not available and none of the requests
+            # were run. Otherwise (server error, timeout) the requests may have been run and are not sent again
+            if response_info.get('status_code') in SERVICENOW_BATCH_UNAVAILABLE_STATUS_CODES:
+                self.debug_print("The Batch API is not available, sending the requests individually")
+                self._bulk_stats['batch_api'] = False
+                return dict()
+            return {request['id']: (False, action_result.get_message()) for request in bulk_requests}
+
+        self._bulk_stats['batch_requests'] += 1
+
+        endpoints = {request['id']: request['endpoint'] for request in bulk_requests}
+        responses = dict()
+        for serviced in response.get('serviced_requests', []):
+            try:
+                body = json.loads(base64.b64decode(serviced.get('body') or '') or '{}')
+            except Exception:
+                body = {}
+
+            status_code = serviced.get('status_code', 0)
+            if 200 <= status_code < 400:
+                responses[serviced.get('id')] = (True, body)
+                continue
+
+            if status_code == requests.codes.not_found and serviced.get('id') in endpoints:  # pylint: disable=E1101
+                self._evict_stale_sys_id(endpoints[serviced['id']])
+
+            error = body.get('error') if isinstance(body, dict) else None
+            message = error.get('message') if isinstance(error, dict) else serviced.get('status_text')
+            responses[serviced.get('id')] = (False, "Error from server. Status Code: {0} Data from server: {1}".format(
+                status_code, message))
+
+        return responses
+
+    def _send_bulk_request(self, request, auth, headers):
+        """ This method sends one request of a bulk operation on its own.
+        :param request: Dictionary of the request, as returned by _get_bulk_request
+        :param auth: Authentication object
+        :param headers: Request headers
+        :return: whether the request succeeded, response body or error message
+        """
+
+        request_result = ActionResult()
+        ret_val, response = self._make_rest_call_helper(request_result, request['endpoint'], params=request['params'],
+                                data=request['data'], auth=auth, headers=dict(headers), method=request['method'])
+
+        if phantom.is_fail(ret_val):
+            return False, request_result.get_message()
+
+        return True, response
+
     def _list_tickets(self, param):
 
         action_result = self.add_action_result(ActionResult(dict(param)))
@@ -1442,6 +2750,10 @@ class ServicenowConnector(BaseConnector):
             'sysparm_query': param.get(SERVICENOW_JSON_FILTER, "")
         }
 
+        fields = self._get_sysparm_fields(param.get(SERVICENOW_JSON_FIELDS))
+        if fields:
+            request_params['sysparm_fields'] = fields
+
         limit = self._validate_integers(action_result, param.get(SERVICENOW_JSON_MAX_RESULTS,
                                 SERVICENOW_DEFAULT_MAX_LIMIT), SERVICENOW_JSON_MAX_RESULTS)
         if limit is None:
@@ -1451,13 +2763,13 @@ class ServicenowConnector(BaseConnector):
         if phantom.is_fail(ret_val):
             return action_result.set_status(phantom.APP_ERROR, "Unable to get authorization credentials")
 
-        tickets = self._paginator(endpoint, action_result, payload=request_params, limit=limit)
-
-        if tickets is None:
-            return action_result.get_status()
+        for ret_val, tickets in self._paginator(endpoint, action_result, payload=request_params, limit=limit,
+                                                concurrency=self._page_concurrency):
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
 
-        for ticket in tickets:
-            action_result.add_data(ticket)
+            for ticket in tickets:
+                action_result.add_data(ticket)
 
         action_result.update_summary({SERVICENOW_JSON_TOTAL_TICKETS: action_result.get_data_size()})
 
@@ -1491,7 +2803,7 @@ class ServicenowConnector(BaseConnector):
             return action_result.set_status(
                 phantom.APP_ERROR, 'No data found for the requested item having System ID: {0}'.format(sys_id))
 
-        variables = dict()
+        item_option_values = list()
         for item in response['result']:
             sc_item_option = item.get('sc_item_option')
             if not sc_item_option or not item['sc_item_option'].get('value'):
@@ -1507,61 +2819,68 @@ class ServicenowConnector(BaseConnector):
                     (if any or if applicable) in the 'sc_item_option' value")
                 item_option_value = item['sc_item_option']['value']
 
-            endpoint = '/table/{0}/{1}'.format(SERVICENOW_ITEM_OPT_TABLE, item_option_value)
-            ret_val, auth, headers = self._get_authorization_credentials(action_result)
-            if phantom.is_fail(ret_val):
-                return action_result.set_status(phantom.APP_ERROR, "Unable to get authorization credentials")
+            item_option_values.append(item_option_value)
 
-            ret_val, response = self._make_rest_call_helper(action_result, endpoint, auth=auth, headers=headers)
+        # The variable values and then their questions are fetched with a single sys_idIN query each
+        ret_val, records = self._get_records_by_values(action_result, '/table/{0}'.format(SERVICENOW_ITEM_OPT_TABLE), 'sys_id',
+                                    item_option_values, fields=SERVICENOW_ITEM_OPT_FIELDS)
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+        item_options = {record.get('sys_id'): record for record in records}
 
-            if phantom.is_fail(ret_val):
-                return action_result.get_status()
+        question_ids = dict()
+        for item_option_value in item_option_values:
+            item_option = item_options.get(item_option_value)
 
             # If no result found or no key for value found, throw error
-            if not response.get('result') or response['result'].get('value') is None:
+            if not item_option or item_option.get('value') is None:
                 return action_result.set_status(phantom.APP_ERROR,
                 SERVICENOW_ERR_FETCH_VALUE.format(item_opt_value=item_option_value, sys_id=sys_id))
 
-            response_value = response['result']['value']
-
-            # If no result found or no key for item_option_new found or no key found for
+            # If no key for item_option_new found or no key found for
             # value inside item_option_new dictionary, throw error
             new_option = 'item_option_new'
-            if not response.get('result') or response['result'].get(new_option) is None or \
-                    (isinstance(response['result'][new_option], dict) and not response['result'][new_option].get('value')):
+            if item_option.get(new_option) is None or \
+                    (isinstance(item_option[new_option], dict) and not item_option[new_option].get('value')):
                 return action_result.set_status(phantom.APP_ERROR,
                 SERVICENOW_ERR_FETCH_QUESTION_ID.format(item_opt_value=item_option_value, sys_id=sys_id))
 
             # The dictionary for item_option_new can be empty if no question is available
             # for a given variable which is a valid scenario
-            if not response['result']['item_option_new']:
-                response_question = ""
-                variables[response_question] = response_value
+            if not item_option['item_option_new']:
                 continue
-            question_id = response['result']['item_option_new']['value']
+            question_id = item_option['item_option_new']['value']
 
             try:
                 question_id = self._handle_py_ver_compat_for_input_str(question_id)
             except:
                 self.debug_print("Error while handling Unicode characters (if any or if applicable) in the 'question_id' value")
-                question_id = response['result']['item_option_new']['value']
+                question_id = item_option['item_option_new']['value']
 
-            endpoint = '/table/{0}/{1}'.format(SERVICENOW_ITEM_OPT_NEW_TABLE, question_id)
-            ret_val, auth, headers = self._get_authorization_credentials(action_result)
-            if phantom.is_fail(ret_val):
-                return action_result.set_status(phantom.APP_ERROR, "Unable to get authorization credentials")
+            question_ids[item_option_value] = question_id
+
+        ret_val, records = self._get_records_by_values(action_result, '/table/{0}'.format(SERVICENOW_ITEM_OPT_NEW_TABLE), 'sys_id',
+                                    list(set(question_ids.values())), fields=SERVICENOW_ITEM_OPT_NEW_FIELDS)
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+        questions = {record.get('sys_id'): record for record in records}
 
-            ret_val, response = self._make_rest_call_helper(action_result, endpoint, auth=auth, headers=headers)
+        variables = dict()
+        for item_option_value in item_option_values:
+            response_value = item_options[item_option_value]['value']
 
-            if phantom.is_fail(ret_val):
-                return action_result.get_status()
+            if item_option_value not in question_ids:
+                response_question = ""
+                variables[response_question] = response_value
+                continue
+            question_id = question_ids[item_option_value]
 
             # If no result found or no key for question_text found, throw error
-            if not response.get('result') or response['result'].get('question_text') is None:
+            if not questions.get(question_id) or questions[question_id].get('question_text') is None:
                 return action_result.set_status(phantom.APP_ERROR,
                 SERVICENOW_ERR_FETCH_QUESTION.format(question_id=question_id, item_opt_value=item_option_value, sys_id=sys_id))
 
-            response_question = response['result']['question_text']
+            response_question = questions[question_id]['question_text']
 
             variables[response_question] = response_value
 
@@ -1597,13 +2916,18 @@ class ServicenowConnector(BaseConnector):
         if phantom.is_fail(ret_val):
             return action_result.set_status(phantom.APP_ERROR, "Unable to get authorization credentials")
 
-        tickets = self._paginator(endpoint, action_result, limit=limit)
+        request_params = dict()
+        fields = self._get_sysparm_fields(param.get(SERVICENOW_JSON_FIELDS))
+        if fields:
+            request_params['sysparm_fields'] = fields
 
-        if tickets is None:
-            return action_result.get_status()
+        for ret_val, tickets in self._paginator(endpoint, action_result, payload=request_params, limit=limit,
+                                                concurrency=self._page_concurrency):
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
 
-        for ticket in tickets:
-            action_result.add_data(ticket)
+            for ticket in tickets:
+                action_result.add_data(ticket)
 
         action_result.update_summary({SERVICENOW_JSON_TOTAL_TICKETS: action_result.get_data_size()})
 
@@ -1611,32 +2935,6 @@ class ServicenowConnector(BaseConnector):
 
     def _on_poll(self, param):
 
-        URI_REGEX = '[Hh][Tt][Tt][Pp][Ss]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+#]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        HASH_REGEX = '\\b[0-9a-fA-F]{32}\\b|\\b[0-9a-fA-F]{40}\\b|\\b[0-9a-fA-F]{64}\\b'
-        IP_REGEX = '\\d{1,3}\\.\\d{1,3}\\.\\d{1,3}\\.\\d{1,3}'
-        IPV6_REGEX = '\\s*((([0-9A-Fa-f]{1,4}:){7}([0-9A-Fa-f]{1,4}|:))|'
-        IPV6_REGEX += ('(([0-9A-Fa-f]{1,4}:){6}(:[0-9A-Fa-f]{1,4}|((25[0-5]|'
-            '2[0-4]\\d|1\\d\\d|[1-9]?\\d)(\\.(25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)){3})|:))')
-        IPV6_REGEX += ('|(([0-9A-Fa-f]{1,4}:){5}(((:[0-9A-Fa-f]{1,4}){1,2})|:'
-            '((25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)(\\.(25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)){3})|:))|')
-        IPV6_REGEX += ('(([0-9A-Fa-f]{1,4}:){4}(((:[0-9A-Fa-f]{1,4}){1,3})|((:[0-9A-Fa-f]{1,4})?:'
-            '((25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)(\\.'
-            '(25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)){3}))|:))|')
-        IPV6_REGEX += ('(([0-9A-Fa-f]{1,4}:){3}(((:[0-9A-Fa-f]{1,4}){1,4})|((:'
-            '[0-9A-Fa-f]{1,4}){0,2}:((25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)(\\.'
-    '(25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)){3}))|:))|')
-        IPV6_REGEX += ('(([0-9A-Fa-f]{1,4}:){2}(((:[0-9A-Fa-f]{1,4}){1,5})|'
-            '((:[0-9A-Fa-f]{1,4}){0,3}:((25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)(\\.'
-    '(25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)){3}))|:))|')
-        IPV6_REGEX += ('(([0-9A-Fa-f]{1,4}:){1}(((:[0-9A-Fa-f]{1,4}){1,6})|'
-            '((:[0-9A-Fa-f]{1,4}){0,4}:((25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)(\\.'
-    '(25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)){3}))|:))|')
-        IPV6_REGEX += ('(:(((:[0-9A-Fa-f]{1,4}){1,7})|((:[0-9A-Fa-f]{1,4}){0,5}:((25[0-5]|2[0-4]\\d|1\\d\\d|'
-            '[1-9]?\\d)(\\.(25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)){3}))|:)))(%.+)?\\s*')
-        uri_regexc = re.compile(URI_REGEX)
-        hash_regexc = re.compile(HASH_REGEX)
-        ip_regexc = re.compile(IP_REGEX)
-        ipv6_regexc = re.compile(IPV6_REGEX)
         # Progress
         self.save_progress(SERVICENOW_USING_BASE_URL, base_url=self._base_url)
 
@@ -1649,33 +2947,162 @@ class ServicenowConnector(BaseConnector):
         # Add action result
         action_result = self.add_action_result(phantom.ActionResult(param))
 
+        ret_val, tables = self._get_on_poll_tables(action_result, config)
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        # The severity is looked up once for all the tables
+        if config.get('severity'):
+            severity = config.get('severity', 'medium').lower()
+            ret_val, message = self._validate_custom_severity(action_result, severity)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+        else:
+            ret_val, default_severity = self._find_default_severity(action_result)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+            severity = config.get('severity', default_severity).lower()
+
+        extract_ips = config.get(SERVICENOW_JSON_EXTRACT_IPS)
+        extract_hashes = config.get(SERVICENOW_JSON_EXTRACT_HASHES)
+        extract_url = config.get(SERVICENOW_JSON_EXTRACT_URLS)
+        extractor = partial(extract_iocs, extract_ips=extract_ips, extract_hashes=extract_hashes, extract_urls=extract_url)
+
+        # A single table keeps its watermark at the top of the state as before, every table of
+        # on_poll_tables gets its own entry in the state
+        table_states = list()
+        for table in tables:
+            if config.get(SERVICENOW_JSON_ON_POLL_TABLES):
+                table_states.append(self._state.setdefault('tables', dict()).setdefault(table['table'], dict()))
+            else:
+                table_states.append(self._state)
+
+        self._load_fingerprint_store()
+
+        table_results = [ActionResult(dict(param)) for table in tables]
+        poll_args = [(table_result, param, table, table_state, severity, extractor)
+                     for table_result, table, table_state in zip(table_results, tables, table_states)]
+
+        # The tables are polled concurrently and share the session of the connector
+        if len(tables) > 1:
+            with ThreadPoolExecutor(max_workers=len(tables)) as executor:
+                list(executor.map(lambda args: self._poll_table(*args), poll_args))
+        else:
+            self._poll_table(*poll_args[0])
+
+        self._save_fingerprint_store()
+
+        if len(tables) == 1:
+            action_result.update_summary(table_results[0].get_summary())
+            return action_result.set_status(table_results[0].get_status(), table_results[0].get_message())
+
+        summary_keys = ['tickets_ingested', 'tickets_failed', 'tickets_skipped', 'tickets_unchanged', 'tickets_per_second']
+        if self._ingest_attachments:
+            summary_keys.extend(SERVICENOW_ATTACHMENT_SUMMARY_KEYS)
+
+        summary = action_result.update_summary({})
+        errors = list()
+        for table, table_result in zip(tables, table_results):
+            table_summary = table_result.get_summary()
+            for key in summary_keys:
+                summary[key] = summary.get(key, 0) + table_summary.get(key, 0)
+            summary.setdefault('tables', dict())[table['table']] = table_summary
+            if phantom.is_fail(table_result.get_status()):
+                errors.append('{0}: {1}'.format(table['table'], table_result.get_message()))
+
+        if errors:
+            return action_result.set_status(phantom.APP_ERROR, '. '.join(errors))
+
+        return action_result.set_status(phantom.APP_SUCCESS)
+
+    def _get_on_poll_tables(self, action_result, config):
+        """ This method returns the tables to poll, from the on_poll_tables JSON list if provided,
+        from the on_poll_table, on_poll_filter and container label of the asset otherwise.
+        :param action_result: Action result object
+        :param config: Asset configuration
+        :return: status phantom.APP_SUCCESS/phantom.APP_ERROR (along with appropriate message),
+            list of dictionaries with the table name, filter and container label
+        """
+
+        label = config.get('ingest', {}).get('container_label')
+        on_poll_tables = config.get(SERVICENOW_JSON_ON_POLL_TABLES)
+
+        if not on_poll_tables:
+            return RetVal(phantom.APP_SUCCESS, [{
+                'table': config.get(SERVICENOW_JSON_ON_POLL_TABLE, SERVICENOW_DEFAULT_TABLE),
+                'filter': config.get(SERVICENOW_JSON_ON_POLL_FILTER, ""),
+                'label': label}])
+
+        try:
+            on_poll_tables = json.loads(on_poll_tables)
+        except Exception as e:
+            error_msg = self._get_error_message_from_exception(e)
+            return RetVal(action_result.set_status(phantom.APP_ERROR, "Error parsing the {0} parameter: {1}".format(
+                SERVICENOW_JSON_ON_POLL_TABLES, error_msg)), None)
+
+        if not isinstance(on_poll_tables, list) or not on_poll_tables:
+            return RetVal(action_result.set_status(phantom.APP_ERROR, SERVICENOW_ERR_ON_POLL_TABLES), None)
+
+        tables = list()
+        for table in on_poll_tables:
+            if not isinstance(table, dict) or not table.get('table') or not isinstance(table['table'], str):
+                return RetVal(action_result.set_status(phantom.APP_ERROR, SERVICENOW_ERR_ON_POLL_TABLES), None)
+            if table['table'] in [added['table'] for added in tables]:
+                return RetVal(action_result.set_status(phantom.APP_ERROR, SERVICENOW_ERR_ON_POLL_TABLES_DUPLICATE.format(
+                    table=table['table'])), None)
+            tables.append({
+                'table': table['table'],
+                'filter': table.get('filter') or "",
+                'label': table.get('label') or label})
+
+        return RetVal(phantom.APP_SUCCESS, tables)
+
+    def _poll_table(self, action_result, param, table, table_state, severity, extractor):
+        """ This method ingests the tickets/records of one On Poll table.
+        :param action_result: Action result object of the table
+        :param param: Dictionary of input parameters
+        :param table: Dictionary with the table name, filter and container label
+        :param table_state: Dictionary the watermark and the progress of the table are kept in
+        :param severity: Severity of the containers and artifacts
+        :param extractor: Function extracting the indicators of an issue text
+        :return: status phantom.APP_SUCCESS/phantom.APP_ERROR (along with appropriate message)
+        """
+
+        config = self.get_config()
+
         # Get time from last poll, save now as time for this poll
-        last_time = self._state.get('last_time')
+        last_time = table_state.get('last_time')
 
         if last_time and isinstance(last_time, float):
             last_time = datetime.strftime(datetime.fromtimestamp(last_time), SERVICENOW_DATETIME_FORMAT)
 
-        # Build the query for the issue search (sysparm_query)
-        query = "ORDERBYsys_updated_on"
+        # Build the query for the issue search (sysparm_query), the issues are
+        # ordered by sys_updated_on and sys_id through the keyset pagination
+        query = list()
 
-        action_query = config.get(SERVICENOW_JSON_ON_POLL_FILTER, "")
+        action_query = table['filter']
 
         if len(action_query) > 0:
-            query += '^{}'.format(action_query)
+            query.append(action_query)
+
+        # Only the polls which are not filtered on the update time can backfill the history in time slices
+        backfill_run = False
 
         # If it's a poll now don't filter based on update time
         if self.is_poll_now():
             max_tickets = param.get(phantom.APP_JSON_CONTAINER_COUNT)
         # If it's the first poll, don't filter based on update time
-        elif self._state.get('first_run', True):
-            self._state['first_run'] = False
+        elif table_state.get('first_run', True):
+            with self._poll_lock:
+                table_state['first_run'] = False
             max_tickets = self._first_run_container
+            backfill_run = True
         # If it's scheduled polling add a filter for update time being greater than the last poll time
         else:
             # "last_time" should be of the format "%Y-%m-%d %H:%M:%S"
             if last_time and len(last_time.split(" ")) == 2:
                 query_prefix = last_time.split(" ")
-                query += "^sys_updated_on>=javascript:gs.dateGenerate('{}','{}')".format(query_prefix[0], query_prefix[1])
+                query.append("sys_updated_on>=javascript:gs.dateGenerate('{}','{}')".format(query_prefix[0], query_prefix[1]))
                 max_tickets = self._max_container
             else:
                 self.debug_print("Either 'last_time' is None or empty or it is not \
@@ -1684,147 +3111,248 @@ class ServicenowConnector(BaseConnector):
                     polling run; skipping time-based query filtering; processing the on_poll workflow accordingly")
 
                 max_tickets = self._first_run_container
+                backfill_run = True
 
                 self.debug_print(
                     "Setting the 'max_tickets' to the value of 'first_run_container'. max_tickets: {}".format(max_tickets))
 
-        self.debug_print("Polling with this query: {0}".format(query))
+        query = '^'.join(query)
+        self.debug_print("Polling the {0} table with this query: {1}".format(table['table'], query))
 
-        on_poll_table_name = config.get(SERVICENOW_JSON_ON_POLL_TABLE, SERVICENOW_DEFAULT_TABLE)
-        endpoint = '/table/{}'.format(on_poll_table_name.lower())
+        # A checkpoint left by an interrupted poll of the same query resumes after its last committed ticket
+        checkpoint = table_state.get('checkpoint')
+        start_after = None
+        if not self.is_poll_now() and checkpoint and checkpoint.get('query') == query:
+            start_after = checkpoint
+            self.debug_print("Resuming the poll after the ticket with sys_id {0} updated on {1}".format(
+                checkpoint['sys_id'], checkpoint['sys_updated_on']))
+
+        endpoint = '/table/{}'.format(table['table'].lower())
         params = {
             'sysparm_query': query,
             'sysparm_exclude_reference_link': 'true'}
 
-        limit = max_tickets
-
-        issues = self._paginator(endpoint, action_result, payload=params, limit=limit)
-
-        if issues is None:
-            self.debug_print(action_result.get_message())
-            action_result.set_status(phantom.APP_ERROR, action_result.get_message())
-            return phantom.APP_ERROR
+        fields = self._get_sysparm_fields(config.get(SERVICENOW_JSON_ON_POLL_FIELDS), SERVICENOW_ON_POLL_MANDATORY_FIELDS)
+        if fields:
+            params['sysparm_fields'] = fields
 
-        if not issues:
-            return action_result.set_status(phantom.APP_SUCCESS, 'No issues found. Nothing to ingest.')
+        limit = max_tickets
 
         # TODO: handle cases where we go over the ingestions limit
 
         # Ingest the issues
         failed = 0
-        label = self.get_config().get('ingest', {}).get('container_label')
-
-        if config.get('severity'):
-            severity = config.get('severity', 'medium').lower()
-            ret_val, message = self._validate_custom_severity(action_result, severity)
-            if phantom.is_fail(ret_val):
-                return action_result.get_status()
+        label = table['label']
+
+        # The issues are ingested page by page as they arrive, only the last one is kept for the poll time.
+        # The new containers (with their artifacts) and the artifacts of the existing containers are
+        # buffered and saved in bulk every ingest_batch_size tickets
+        last_issue = None
+        ingested = 0
+        skipped = 0
+        unchanged = 0
+        new_containers = []
+        ticket_artifacts = []
+        fingerprints = dict()
+        start_time = time.time()
+
+        # The attachments of the ingested tickets are downloaded to the vault once their containers are saved
+        pending_attachments = []
+        container_ids = dict()
+        attachment_stats = dict.fromkeys(SERVICENOW_ATTACHMENT_SUMMARY_KEYS, 0)
+
+        # The sys_ids (with their sys_mod_count) of the tickets updated during the last second of the previous poll
+        # are fetched again by the sys_updated_on>= filter, the unchanged ones are skipped before any other work
+        boundary = dict() if self.is_poll_now() else table_state.get('boundary', {})
+        boundary_time = boundary.get('sys_updated_on')
+        boundary_records = dict(boundary.get('records', {}))
+        previous_time = boundary_time
+        previous_records = dict(boundary_records)
+
+        # A backfill splits the history in sys_updated_on time slices fetched concurrently, the slices
+        # already ingested by an interrupted backfill of the same query are not fetched again
+        backfill = None
+        completed_slices = set()
+        if backfill_run and self._backfill_slices > 1:
+            backfill = table_state.get('backfill')
+            if not backfill or backfill.get('query') != query:
+                ret_val, slices = self._get_backfill_slices(action_result, endpoint, query, limit)
+                if phantom.is_fail(ret_val):
+                    return action_result.get_status()
+                backfill = {'query': query, 'slices': slices}
+                with self._poll_lock:
+                    table_state['backfill'] = backfill
+
+        if backfill:
+            pages = self._backfill_pages(endpoint, action_result, params, limit, backfill['slices'], completed_slices,
+                                         start_after=start_after)
         else:
-            ret_val, default_severity = self._find_default_severity(action_result)
-            if phantom.is_fail(ret_val):
-                return action_result.get_status()
-            severity = config.get('severity', default_severity).lower()
+            pages = self._paginator(endpoint, action_result, payload=params, limit=limit, keyset=True, start_after=start_after)
 
-        for issue in issues:
+        for ret_val, issues in pages:
 
-            sdi = issue['sys_id']
-            sd = issue.get('short_description')
-            desc = issue.get('description', '')
-            existing_label = None
-            existing_sd = None
-            existing_desc = None
+            if phantom.is_fail(ret_val):
+                self.debug_print(action_result.get_message())
+                action_result.set_status(phantom.APP_ERROR, action_result.get_message())
+                return phantom.APP_ERROR
 
-            container_id, existing_label, existing_sd, existing_desc = self._check_for_existing_container(sdi, label)
-            if not sd:
-                sd = 'Phantom added container name (short description of the ticket/record found empty)'
-            sd = self._handle_py_ver_compat_for_input_str(sd)
+            if issues:
+                last_issue = issues[-1]
+
+            # The unchanged tickets of the boundary second of the previous poll are skipped, then the fingerprint
+            # of every ticket ingested before with the same label tells whether it is new, changed or unchanged.
+            # The skipped and unchanged tickets cost no lookup and no write. A poll now ingests every ticket,
+            # so that it recreates the containers deleted since they were ingested
+            page_fingerprints = dict()
+            for issue in issues:
+                if issue.get('sys_updated_on') == previous_time and \
+                        previous_records.get(issue['sys_id'], False) == issue.get('sys_mod_count'):
+                    skipped += 1
+                    continue
 
-            if not container_id or existing_label != label:
+                fingerprint = self._get_fingerprint(issue)
+                previous = None if self.is_poll_now() else self._get_fingerprint_entry(label, issue['sys_id'])
+                if previous is not None and previous[0] == fingerprint:
+                    unchanged += 1
+                    continue
+                page_fingerprints[issue['sys_id']] = (fingerprint, previous)
+
+            new_issues = [issue for issue in issues if issue['sys_id'] in page_fingerprints]
+            existing_containers = self._get_existing_containers([issue['sys_id'] for issue in new_issues], label)
+            page_iocs = self._extract_page_iocs(new_issues, extractor)
+            page_attachments = dict()
+            if self._ingest_attachments and new_issues:
+                page_attachments = self._get_page_attachments(table['table'].lower(), new_issues)
+
+            for issue in issues:
+
+                # The boundary second follows the tickets as they are ingested, so that a checkpoint
+                # only records the tickets committed before it
+                updated_on = issue.get('sys_updated_on')
+                if updated_on != boundary_time:
+                    boundary_time = updated_on
+                    boundary_records = dict()
+                boundary_records[issue['sys_id']] = issue.get('sys_mod_count')
+
+                if issue['sys_id'] not in page_fingerprints:
+                    continue
+                iocs = next(page_iocs)
 
+                sdi = issue['sys_id']
+                sd = issue.get('short_description')
                 desc = issue.get('description', '')
-                container = dict(
+                existing_label = None
+                existing_sd = None
+                existing_desc = None
+
+                if existing_containers is None:
+                    container_id, existing_label, existing_sd, existing_desc = self._check_for_existing_container(sdi, label)
+                else:
+                    container_id, existing_label, existing_sd, existing_desc = existing_containers.get(sdi, (0, None, None, None))
+                if not sd:
+                    sd = 'Phantom added container name (short description of the ticket/record found empty)'
+                sd = self._handle_py_ver_compat_for_input_str(sd)
+
+                artifacts = []
+                artifact_dict = dict(
                     data=issue,
-                    description=desc,
-                    label=label,
+                    description=sd,
+                    cef=issue,
+                    label='issue',
                     severity=severity,
-                    name='{}'.format(sd),
+                    name=issue.get('number', 'Phantom added artifact name (number of the ticket/record found empty)'),
                     source_data_identifier=issue['sys_id']
                 )
-                ret_val, _, container_id = self.save_container(container)
-
-                if phantom.is_fail(ret_val):
-                    failed += 1
-                    continue
+                artifacts.append(artifact_dict)
+                fingerprint, previous = page_fingerprints[sdi]
+                fingerprints[sdi] = [fingerprint, []]
+                is_existing = container_id and existing_label == label
+                for ioc_type, cef_key, ioc_label in SERVICENOW_IOC_ARTIFACTS:
+                    for ioc in iocs[ioc_type]:
+                        ioc_fingerprint = self._get_fingerprint([ioc_type, ioc])
+                        fingerprints[sdi][1].append(ioc_fingerprint)
+                        # A changed ticket only gets the artifacts of the indicators it did not have yet
+                        if previous is not None and is_existing and ioc_fingerprint in previous[1]:
+                            continue
+                        art = {'label': ioc_label,
+                           'cef': {cef_key: ioc}}
+                        artifacts.append(art)
+
+                if not is_existing:
+
+                    container = dict(
+                        data=issue,
+                        description=desc,
+                        label=label,
+                        severity=severity,
+                        name='{}'.format(sd),
+                        source_data_identifier=issue['sys_id'],
+                        artifacts=artifacts
+                    )
+                    new_containers.append(container)
 
-            # In case of Python version 2, if container already exists for the same label but
-            # the data fetched is updated, it would update the container accordingly
-            elif (existing_sd != sd or existing_desc != desc) and self._python_version == 2:
-                data = dict(
-                    data=issue,
-                    description=desc,
-                    name='{}'.format(sd)
-                )
-                status, message = phrules.update({"id": container_id}, data)
-
-            artifacts = []
-            artifact_dict = dict(
-                container_id=container_id,
-                data=issue,
-                description=sd,
-                cef=issue,
-                label='issue',
-                severity=severity,
-                name=issue.get('number', 'Phantom added artifact name (number of the ticket/record found empty)'),
-                source_data_identifier=issue['sys_id']
-            )
-            artifacts.append(artifact_dict)
-            extract_ips = config.get(SERVICENOW_JSON_EXTRACT_IPS)
-            extract_hashes = config.get(SERVICENOW_JSON_EXTRACT_HASHES)
-            extract_url = config.get(SERVICENOW_JSON_EXTRACT_URLS)
-            if extract_ips:
-                for match in ip_regexc.finditer(str(issue)):
-                    cef = {}
-                    cef['ip_address'] = match.group()
-                    art = {'container_id': container_id,
-                       'label': 'IP Address',
-                       'cef': cef}
-                    artifacts.append(art)
-
-                for match in ipv6_regexc.finditer(str(issue)):
-                    cef = {}
-                    cef['ipv6_address'] = match.group()
-                    art = {'container_id': container_id,
-                       'label': 'IPV6 Address',
-                       'cef': cef}
-                    artifacts.append(art)
-
-            if extract_hashes:
-                for match in hash_regexc.finditer(str(issue)):
-                    cef = {}
-                    cef['hash'] = match.group()
-                    art = {'container_id': container_id,
-                       'label': 'Hash',
-                       'cef': cef}
-                    artifacts.append(art)
-
-            if extract_url:
-                for match in uri_regexc.finditer(str(issue)):
-                    cef = {}
-                    cef['URL'] = match.group()
-                    art = {'container_id': container_id,
-                       'label': 'URL',
-                       'cef': cef}
-                    artifacts.append(art)
-            self.save_artifacts(artifacts)
+                else:
+                    # If the container already exists for the same label but the data fetched is updated,
+                    # it would update the container accordingly
+                    if previous is not None or existing_sd != sd or existing_desc != desc:
+                        data = dict(
+                            data=issue,
+                            description=desc,
+                            name='{}'.format(sd)
+                        )
+                        with self._poll_lock:
+                            self._update_container(container_id, data)
+
+                    for art in artifacts:
+                        art['container_id'] = container_id
+                    ticket_artifacts.append(artifacts)
+
+                if page_attachments.get(sdi):
+                    pending_attachments.append((sdi, container_id if is_existing else None, page_attachments[sdi]))
+
+                ingested += 1
+
+                if ingested % self._ingest_batch_size == 0:
+                    with self._poll_lock:
+                        failed += self._save_ingest_batch(new_containers, ticket_artifacts, fingerprints, label, container_ids)
+                        new_containers = []
+                        ticket_artifacts = []
+                        fingerprints = dict()
+                        table_state['boundary'] = {'sys_updated_on': boundary_time, 'records': boundary_records}
+                        for index in completed_slices:
+                            backfill['slices'][index]['done'] = True
+                        self._save_poll_checkpoint(table_state, query, issue)
+
+                    self._ingest_ticket_attachments(pending_attachments, container_ids, attachment_stats)
+                    pending_attachments = []
+                    container_ids = dict()
+
+        with self._poll_lock:
+            failed += self._save_ingest_batch(new_containers, ticket_artifacts, fingerprints, label, container_ids)
+
+        self._ingest_ticket_attachments(pending_attachments, container_ids, attachment_stats)
+
+        elapsed = time.time() - start_time
+        action_result.update_summary({
+            'tickets_ingested': ingested - failed,
+            'tickets_failed': failed,
+            'tickets_skipped': skipped,
+            'tickets_unchanged': unchanged,
+            'tickets_per_second': round(ingested / elapsed, 2) if elapsed else ingested})
+        if self._ingest_attachments:
+            action_result.update_summary(attachment_stats)
+
+        if last_issue is None:
+            return action_result.set_status(phantom.APP_SUCCESS, 'No issues found. Nothing to ingest.')
 
         action_result.set_status(phantom.APP_SUCCESS, 'Containers created')
 
         if not self.is_poll_now():
 
-            if 'sys_updated_on' not in issues[-1]:
+            if 'sys_updated_on' not in last_issue:
                 return action_result.set_status(phantom.APP_ERROR, "No updated time in last ingested incident.")
 
-            updated_time = issues[-1]["sys_updated_on"]
+            updated_time = last_issue["sys_updated_on"]
 
             if 'timezone' in config:
                 dt = datetime.strptime(updated_time, SERVICENOW_DATETIME_FORMAT)
@@ -1832,21 +3360,585 @@ class ServicenowConnector(BaseConnector):
                 new_dt = dt + tz.utcoffset(dt)
                 updated_time = new_dt.strftime(SERVICENOW_DATETIME_FORMAT)
 
-            self._state['last_time'] = updated_time
+            with self._poll_lock:
+                table_state['last_time'] = updated_time
+                table_state['boundary'] = {'sys_updated_on': boundary_time, 'records': boundary_records}
+                table_state.pop('checkpoint', None)
+                table_state.pop('backfill', None)
 
-            if self._state.get('first_run', True):
-                self._state['first_run'] = False
+                if table_state.get('first_run', True):
+                    table_state['first_run'] = False
 
         if failed:
             return action_result.set_status(phantom.APP_ERROR, SERVICENOW_ERR_FAILURES)
 
-        self.save_state(self._state)
+        with self._poll_lock:
+            self.save_state(self._state)
 
         return action_result.set_status(phantom.APP_SUCCESS)
 
+    def _get_backfill_slices(self, action_result, endpoint, query, limit=None):
+        """ This method splits the sys_updated_on range of the records matching the query in time slices of the same length.
+        With a limit, the range stops at the last of the oldest limit records, since the others are not ingested.
+        :param action_result: Action result object
+        :param endpoint: REST endpoint of the table
+        :param query: Encoded query of the poll
+        :param limit: Maximum number of records to ingest, all the records are ingested if not provided
+        :return: status phantom.APP_SUCCESS/phantom.APP_ERROR (along with appropriate message),
+            list of slices with their inclusive start, exclusive end (None for an open last one) and completion
+        """
+
+        ret_val, auth, headers = self._get_authorization_credentials(action_result)
+        if phantom.is_fail(ret_val):
+            return RetVal(action_result.set_status(phantom.APP_ERROR, "Unable to get authorization credentials"), None)
+
+        ret_val, first = self._get_backfill_bound(action_result, endpoint, query, 'ORDERBYsys_updated_on', auth, headers)
+        if phantom.is_fail(ret_val):
+            return RetVal(action_result.get_status(), None)
+
+        if first is None:
+            return RetVal(phantom.APP_SUCCESS, [{'start': None, 'end': None, 'done': False}])
+
+        last = None
+        if limit:
+            ret_val, last = self._get_backfill_bound(action_result, endpoint, query, 'ORDERBYsys_updated_on', auth, headers,
+                                                     offset=limit - 1)
+            if phantom.is_fail(ret_val):
+                return RetVal(action_result.get_status(), None)
+
+        # Fewer records than the limit match the query, the backfill covers all of them
+        bounded = last is not None
+        if not bounded:
+            ret_val, last = self._get_backfill_bound(action_result, endpoint, query, 'ORDERBYDESCsys_updated_on', auth, headers)
+            if phantom.is_fail(ret_val):
+                return RetVal(action_result.get_status(), None)
+            last = last or first
+
+        step = timedelta(seconds=max(1, int((last - first).total_seconds() / self._backfill_slices)))
+
+        slices = list()
+        start = first
+        while start <= last and len(slices) < self._backfill_slices - 1:
+            end = start + step
+            slices.append({'start': start.strftime(SERVICENOW_DATETIME_FORMAT), 'end': end.strftime(SERVICENOW_DATETIME_FORMAT),
+                           'done': False})
+            start = end
+
+        if bounded:
+            # The last slice ends right after the last record to ingest, the records updated later
+            # are fetched by the next poll
+            if start <= last:
+                slices.append({'start': start.strftime(SERVICENOW_DATETIME_FORMAT),
+                               'end': (last + timedelta(seconds=1)).strftime(SERVICENOW_DATETIME_FORMAT), 'done': False})
+        else:
+            # The last slice is left open, so that the records updated during the backfill are fetched as well
+            slices.append({'start': start.strftime(SERVICENOW_DATETIME_FORMAT), 'end': None, 'done': False})
+
+        return RetVal(phantom.APP_SUCCESS, slices)
+
+    def _get_backfill_bound(self, action_result, endpoint, query, order, auth, headers, offset=0):
+        """ This method returns the sys_updated_on of the record at an offset of the records matching the query.
+        :param action_result: Action result object
+        :param endpoint: REST endpoint of the table
+        :param query: Encoded query of the poll
+        :param order: Ordering of the records
+        :param auth: Authentication object
+        :param headers: Request headers
+        :param offset: Offset of the record
+        :return: status phantom.APP_SUCCESS/phantom.APP_ERROR (along with appropriate message),
+            datetime of the record, None if there is no record at the offset
+        """
+
+        params = {
+            'sysparm_query': '{}^{}'.format(query, order) if query else order,
+            'sysparm_fields': 'sys_updated_on',
+            'sysparm_limit': 1}
+        if offset:
+            params['sysparm_offset'] = offset
+
+        ret_val, response = self._make_rest_call_helper(action_result, endpoint, auth=auth, headers=headers, params=params)
+        if phantom.is_fail(ret_val):
+            return RetVal(action_result.get_status(), None)
+
+        records = response.get('result', [])
+        if not records:
+            return RetVal(phantom.APP_SUCCESS, None)
+
+        return RetVal(phantom.APP_SUCCESS, datetime.strptime(records[0]['sys_updated_on'], SERVICENOW_DATETIME_FORMAT))
+
+    def _backfill_pages(self, endpoint, action_result, payload, limit, slices, completed_slices, start_after=None):
+        """ This method fetches the records of the backfill time slices which are not done yet, with at most
+        backfill_workers slices fetched at the same time. The pages are yielded in timestamp order, all the pages
+        of a slice before the ones of the next slice.
+        :param endpoint: REST endpoint of the table
+        :param action_result: Action result object
+        :param payload: Request parameters of the poll
+        :param limit: Maximum number of records to fetch, all the records are fetched if not provided
+        :param slices: List of the backfill slices
+        :param completed_slices: Set the indexes of the slices whose pages were all yielded are added to
+        :param start_after: Dictionary with the sys_updated_on and sys_id of the record to resume after
+        :return: generator of RetVal(status, list of records), it stops after the first failure
+        """
+
+        stop = threading.Event()
+
+        def put_page(pages, page):
+            while not stop.is_set():
+                try:
+                    pages.put(page, timeout=1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def fetch_slice(time_slice, pages):
+            if stop.is_set():
+                return
+
+            slice_payload = dict(payload)
+            query = slice_payload.get('sysparm_query', '')
+            if time_slice['start']:
+                query = self._add_query_condition(query, 'sys_updated_on>={}'.format(time_slice['start']))
+            if time_slice['end']:
+                query = self._add_query_condition(query, 'sys_updated_on<{}'.format(time_slice['end']))
+            slice_payload['sysparm_query'] = query
+
+            slice_start_after = None
+            if start_after and (not time_slice['start'] or time_slice['start'] <= start_after['sys_updated_on']) and \
+                    (not time_slice['end'] or start_after['sys_updated_on'] < time_slice['end']):
+                slice_start_after = start_after
+
+            try:
+                for page in self._paginator(endpoint, action_result, payload=slice_payload, limit=limit, keyset=True,
+                                            start_after=slice_start_after):
+                    if not put_page(pages, page) or phantom.is_fail(page[0]):
+                        return
+            finally:
+                # The end of the slice
+                put_page(pages, None)
+
+        pending = [(index, queue.Queue(maxsize=SERVICENOW_BACKFILL_QUEUE_SIZE)) for index, time_slice in enumerate(slices)
+                   if not time_slice['done']]
+        fetched = 0
+
+        # The slices are submitted in timestamp order, so the slice being consumed is always being fetched
+        with ThreadPoolExecutor(max_workers=self._backfill_workers) as executor:
+            futures = [executor.submit(fetch_slice, slices[index], pages) for index, pages in pending]
+            try:
+                for (index, pages), future in zip(pending, futures):
+                    while True:
+                        page = pages.get()
+                        if page is None:
+                            break
+
+                        ret_val, items = page
+                        if phantom.is_fail(ret_val):
+                            yield page
+                            return
+
+                        if limit:
+                            items = items[:limit - fetched]
+                        fetched += len(items)
+                        yield RetVal(ret_val, items)
+
+                        if limit and fetched >= limit:
+                            return
+
+                    future.result()
+                    completed_slices.add(index)
+            finally:
+                stop.set()
+                for future in futures:
+                    future.cancel()
+
+    def _save_poll_checkpoint(self, table_state, query, issue):
+        """ This method persists the (sys_updated_on, sys_id) of the last ticket of a committed batch,
+        so that a poll interrupted afterwards resumes from it instead of starting over.
+        :param table_state: Dictionary the progress of the polled table is kept in
+        :param query: Encoded query of the poll
+        :param issue: Last ticket of the committed batch
+        :return: None
+        """
+
+        if self.is_poll_now():
+            return
+
+        table_state['checkpoint'] = {
+            'query': query,
+            'sys_updated_on': issue['sys_updated_on'],
+            'sys_id': issue['sys_id']}
+        self.save_state(self._state)
+
+    def _save_ingest_batch(self, containers, ticket_artifacts, fingerprints, label, container_ids=None):
+        """ This method saves a batch of new containers with their artifacts and the artifacts of the tickets
+        whose container already exists with the bulk save APIs. A failed bulk save is retried one ticket at
+        a time, so that a bad ticket only fails itself. The fingerprints of the saved tickets are stored.
+        :param containers: List of the new containers, each one with its artifacts
+        :param ticket_artifacts: List of the artifacts of the existing containers, one list per ticket
+        :param fingerprints: Dictionary of SDI to fingerprint entry of the tickets of the batch
+        :param label: Container label of the tickets
+        :param container_ids: Dictionary to fill with the SDI to container ID of the saved new containers
+        :return: number of the tickets which failed to be ingested
+        """
+
+        failed_sdis = set()
+
+        if containers:
+            ret_val, message, responses = self.save_containers(containers)
+
+            if phantom.is_fail(ret_val):
+                self.debug_print("Bulk container save failed, saving the containers one by one: {0}".format(message))
+                responses = list()
+                for container in containers:
+                    container = dict(container)
+                    artifacts = container.pop('artifacts')
+                    ret_val, message, container_id = self.save_container(container)
+                    if phantom.is_success(ret_val):
+                        for art in artifacts:
+                            art['container_id'] = container_id
+                        ret_val, message, _ = self.save_artifacts(artifacts)
+                    responses.append({'success': phantom.is_success(ret_val), 'message': message, 'container_id': container_id})
+
+            for container, response in zip(containers, responses):
+                if not response.get('success'):
+                    failed_sdis.add(container['source_data_identifier'])
+                    self.debug_print("Failed to ingest the ticket with sys_id {0}: {1}".format(
+                        container['source_data_identifier'], response.get('message')))
+                elif container_ids is not None:
+                    container_ids[container['source_data_identifier']] = response.get('container_id')
+
+        if ticket_artifacts:
+            ret_val, message, _ = self.save_artifacts([art for artifacts in ticket_artifacts for art in artifacts])
+
+            if phantom.is_fail(ret_val):
+                self.debug_print("Bulk artifact save failed, saving the artifacts ticket by ticket: {0}".format(message))
+                for artifacts in ticket_artifacts:
+                    ret_val, message, _ = self.save_artifacts(artifacts)
+                    if phantom.is_fail(ret_val):
+                        failed_sdis.add(artifacts[0]['source_data_identifier'])
+                        self.debug_print("Failed to ingest the ticket with sys_id {0}: {1}".format(
+                            artifacts[0]['source_data_identifier'], message))
+
+        for sdi, entry in fingerprints.items():
+            if sdi not in failed_sdis:
+                self._set_fingerprint_entry(label, sdi, entry)
+
+        return len(failed_sdis)
+
+    def _get_page_attachments(self, table_name, issues):
+        """ This method lists the attachments of a page of tickets with one table_sys_idIN query.
+        :param table_name: Name of the table of the tickets
+        :param issues: List of the tickets
+        :return: dictionary of ticket sys_id to list of attachment records, empty if the attachments could not be listed
+        """
+
+        attachment_result = ActionResult()
+        ret_val, attachments = self._get_records_by_values(attachment_result, '/attachment', 'table_sys_id',
+                                    [issue['sys_id'] for issue in issues], query='table_name={0}'.format(table_name),
+                                    fields=SERVICENOW_ATTACHMENT_FIELDS)
+
+        if phantom.is_fail(ret_val):
+            self.debug_print("Unable to list the attachments of the tickets. Details: {0}".format(attachment_result.get_message()))
+            return dict()
+
+        page_attachments = dict()
+        for attachment in attachments:
+            page_attachments.setdefault(attachment.get('table_sys_id'), []).append(attachment)
+
+        return page_attachments
+
+    def _ingest_ticket_attachments(self, pending_attachments, container_ids, stats):
+        """ This method downloads the attachments of the ingested tickets to the vault of their containers, within the
+        per file and per poll byte budgets. The files already in the vault of an existing container are skipped.
+        :param pending_attachments: List of (ticket sys_id, existing container ID or None, list of attachment records)
+        :param container_ids: Dictionary of ticket sys_id to container ID of the new containers
+        :param stats: Dictionary of the attachment counters to update
+        :return: None
+        """
+
+        if not pending_attachments:
+            return
+
+        ret_val, auth, headers = self._get_authorization_credentials(ActionResult())
+        if phantom.is_fail(ret_val):
+            self.debug_print("Unable to get authorization credentials to download the attachments")
+            stats['attachments_failed'] += sum(len(attachments) for _, _, attachments in pending_attachments)
+            return
+
+        max_file_bytes = self._max_ingest_attachment_size * SERVICENOW_BYTES_PER_MB
+        max_poll_bytes = self._max_poll_attachment_size * SERVICENOW_BYTES_PER_MB
+
+        for sdi, container_id, attachments in pending_attachments:
+            # The tickets whose container failed to be saved have nowhere to put their files
+            existing_hashes = self._get_container_vault_hashes(container_id) if container_id else set()
+            container_id = container_id or container_ids.get(sdi)
+            if not container_id:
+                continue
+
+            for attachment in attachments:
+                file_name = attachment.get('file_name') or attachment.get('sys_id')
+                try:
+                    size = int(attachment.get('size_bytes') or 0)
+                except (TypeError, ValueError):
+                    size = 0
+
+                if (attachment.get('hash') or '').lower() in existing_hashes:
+                    stats['attachments_skipped'] += 1
+                    continue
+
+                # The listed size is reserved from the poll budget before the download, a file of unknown size
+                # reserves as much as a file may take. The download stops as soon as it goes over its own
+                # reservation, so the tables polled concurrently cannot overrun the budget together
+                with self._poll_lock:
+                    remaining = max_poll_bytes - self._poll_attachment_bytes
+                    reserved = size or min(max_file_bytes, remaining)
+                    if size > max_file_bytes or reserved > remaining or reserved <= 0:
+                        self.debug_print("Skipping the attachment {0} of the ticket with sys_id {1}: {2}".format(
+                            file_name, sdi, SERVICENOW_ERR_ATTACHMENT_BUDGET))
+                        stats['attachments_skipped'] += 1
+                        continue
+                    self._poll_attachment_bytes += reserved
+
+                ret_val, response = self._download_attachment_to_vault(attachment, container_id, auth, headers, reserved)
+
+                # The part of the reservation which was not downloaded goes back to the budget
+                with self._poll_lock:
+                    self._poll_attachment_bytes -= reserved - (response if phantom.is_success(ret_val) else 0)
+
+                if phantom.is_fail(ret_val):
+                    self.debug_print("Failed to ingest the attachment {0} of the ticket with sys_id {1}: {2}".format(
+                        file_name, sdi, response))
+                    stats['attachments_failed'] += 1
+                    continue
+
+                stats['attachments_ingested'] += 1
+                stats['attachment_bytes_ingested'] += response
+
+    def _get_container_vault_hashes(self, container_id):
+        """ This method returns the SHA-256 of the files in the vault of a container.
+        :param container_id: ID of the container
+        :return: set of the hex digests
+        """
+
+        try:
+            success, message, files = phrules.vault_info(container_id=container_id)
+        except Exception as e:
+            self.debug_print("Unable to list the vault files of the container {0}: {1}".format(
+                container_id, self._get_error_message_from_exception(e)))
+            return set()
+
+        hashes = set()
+        for file_info in files or []:
+            file_hash = (file_info.get('metadata') or {}).get('sha256')
+            if file_hash:
+                hashes.add(file_hash.lower())
+
+        return hashes
+
+    def _download_attachment_to_vault(self, attachment, container_id, auth, headers, max_bytes):
+        """ This method streams an attachment to a temporary file of the vault directory one chunk at a time
+        and adds it to the vault of the container.
+        :param attachment: Dictionary of the attachment record
+        :param container_id: ID of the container
+        :param auth: Authentication object
+        :param headers: Request headers
+        :param max_bytes: Maximum number of bytes to download
+        :return: status phantom.APP_SUCCESS/phantom.APP_ERROR, number of bytes downloaded or error message
+        """
+
+        url = '{0}{1}/attachment/{2}/file'.format(self._base_url, self._api_uri, attachment.get('sys_id'))
+        file_name = attachment.get('file_name') or attachment.get('sys_id')
+        tmp_path = None
+
+        try:
+            with self._send_request('get', url, auth=auth, headers=dict(headers), stream=True, timeout=self._timeout) as r:
+                if r.status_code != requests.codes.ok:  # pylint: disable=E1101
+                    return RetVal(phantom.APP_ERROR, "Error from server. Status Code: {0}".format(r.status_code))
+
+                written = 0
+                with tempfile.NamedTemporaryFile(dir=Vault.get_vault_tmp_dir(), delete=False) as tmp_file:
+                    tmp_path = tmp_file.name
+                    for chunk in r.iter_content(chunk_size=SERVICENOW_DOWNLOAD_CHUNK_SIZE):
+                        written += len(chunk)
+                        if written > max_bytes:
+                            return RetVal(phantom.APP_ERROR, SERVICENOW_ERR_ATTACHMENT_BUDGET)
+                        tmp_file.write(chunk)
+
+            success, message, vault_id = phrules.vault_add(container=container_id, file_location=tmp_path, file_name=file_name)
+            if not success:
+                return RetVal(phantom.APP_ERROR, message)
+        except Exception as e:
+            return RetVal(phantom.APP_ERROR, self._get_error_message_from_exception(e))
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return RetVal(phantom.APP_SUCCESS, written)
+
+    def _get_fingerprint_store_path(self):
+        """ This method returns the path of the file the ticket fingerprints of the asset are kept in.
+        :return: path of the fingerprint store file
+        """
+
+        return os.path.join(self.get_state_dir(), '{0}_fingerprints.json'.format(self.get_asset_id()))
+
+    def _load_fingerprint_store(self):
+        """ This method loads the ticket fingerprints of the asset. They are kept out of the state, so that
+        the checkpoints saved after every ingest batch do not rewrite them.
+        :return: None
+        """
+
+        # The fingerprints used to be kept in the state
+        store = self._state.pop('fingerprints', None)
+
+        try:
+            with open(self._get_fingerprint_store_path(), 'r') as store_file:
+                loaded = json.load(store_file)
+            if isinstance(loaded, dict):
+                store = loaded
+        except (IOError, OSError, ValueError):
+            pass
+
+        with self._poll_lock:
+            self._fingerprints = store if isinstance(store, dict) else dict()
+
+    def _save_fingerprint_store(self):
+        """ This method persists the ticket fingerprints of the asset, once per poll.
+        :return: None
+        """
+
+        if not self._fingerprint_cache_size:
+            return
+
+        store_path = self._get_fingerprint_store_path()
+        temp_path = '{0}.tmp'.format(store_path)
+        try:
+            with self._poll_lock, open(temp_path, 'w') as store_file:
+                json.dump(self._fingerprints, store_file, separators=(',', ':'))
+            os.replace(temp_path, store_path)
+        except (IOError, OSError) as e:
+            self.debug_print("Unable to save the ticket fingerprints: {0}".format(self._get_error_message_from_exception(e)))
+
+    def _get_fingerprint(self, value):
+        """ This method computes the compact fingerprint of a ticket or an indicator. The fields which change with
+        every update of a ticket without changing its content are left out.
+        :param value: Ticket/record dictionary or JSON serializable indicator
+        :return: fingerprint
+        """
+
+        if isinstance(value, dict):
+            value = {key: field for key, field in value.items() if key not in SERVICENOW_FINGERPRINT_IGNORED_FIELDS}
+
+        content = json.dumps(value, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()[:SERVICENOW_FINGERPRINT_LENGTH]
+
+    def _get_fingerprint_entry(self, label, sdi):
+        """ This method returns the stored fingerprint entry of a ticket and marks it as the most recently used one.
+        :param label: Container label of the ticket
+        :param sdi: Source data identifier of the ticket
+        :return: [fingerprint of the ticket, fingerprints of its indicators], None if the ticket is not known
+        """
+
+        key = '{0}:{1}'.format(label, sdi)
+        with self._poll_lock:
+            store = self._fingerprints
+            if key not in store:
+                return None
+
+            # The store keeps the insertion order, re-inserting an entry moves it to the end
+            entry = store.pop(key)
+            store[key] = entry
+            return entry
+
+    def _set_fingerprint_entry(self, label, sdi, entry):
+        """ This method stores the fingerprint entry of a ticket, evicting the least recently
+        used entries once the store is full.
+        :param label: Container label of the ticket
+        :param sdi: Source data identifier of the ticket
+        :param entry: [fingerprint of the ticket, fingerprints of its indicators]
+        :return: None
+        """
+
+        if not self._fingerprint_cache_size:
+            return
+
+        key = '{0}:{1}'.format(label, sdi)
+        store = self._fingerprints
+        store.pop(key, None)
+        store[key] = entry
+        while len(store) > self._fingerprint_cache_size:
+            del store[next(iter(store))]
+
+    def _update_container(self, container_id, data):
+        """ This method updates the given fields of an existing container with a local REST call.
+        :param container_id: ID of the container
+        :param data: Dictionary of the container fields to update
+        :return: status phantom.APP_SUCCESS/phantom.APP_ERROR
+        """
+
+        request_url = '{0}rest/container/{1}'.format(self.get_phantom_base_url(), container_id)
+
+        try:
+            r = self._session.post(request_url, json=data, verify=False, timeout=self._timeout)   # nosemgrep
+            resp_json = r.json()
+        except Exception as e:
+            self.debug_print("Error updating the container {0}: {1}".format(container_id, self._get_error_message_from_exception(e)))
+            return phantom.APP_ERROR
+
+        if resp_json.get('failed'):
+            self.debug_print("Error updating the container {0}: {1}".format(container_id, resp_json.get('message')))
+            return phantom.APP_ERROR
+
+        return phantom.APP_SUCCESS
+
+    def _get_extraction_pool(self):
+        """ This method returns the extraction process pool, created on first use by any of the polled tables.
+        :return: process pool, None if the indicators are extracted in the main process
+        """
+
+        # The pool can be created from the worker thread of a polled table while the other threads hold locks,
+        # so its processes are started by a fork server instead of forking the connector process
+        with self._extraction_lock:
+            if self._extraction_pool is None and self._extraction_workers > 1:
+                self._extraction_pool = ProcessPoolExecutor(max_workers=self._extraction_workers,
+                                                            mp_context=multiprocessing.get_context('forkserver'))
+            return self._extraction_pool
+
+    def _extract_page_iocs(self, issues, extractor):
+        """ This method extracts the indicators of a page of issues, on the extraction process pool if
+        more than one extraction worker is configured.
+        :param issues: List of issues
+        :param extractor: Function extracting the indicators of an issue text
+        :return: generator of the indicators of every issue, in the order of the issues
+        """
+
+        texts = [get_issue_text(issue) for issue in issues]
+        done = 0
+
+        pool = self._get_extraction_pool()
+        if pool is not None:
+            # The results stream back in order while the workers keep extracting the next batches
+            try:
+                for iocs in pool.map(extractor, texts, chunksize=SERVICENOW_EXTRACTION_BATCH_SIZE):
+                    done += 1
+                    yield iocs
+                return
+            except BrokenProcessPool as e:
+                self.debug_print("Extraction process pool failed, extracting in the main process: {0}".format(
+                    self._get_error_message_from_exception(e)))
+                with self._extraction_lock:
+                    self._extraction_workers = 1
+                    if self._extraction_pool is pool:
+                        self._extraction_pool = None
+                pool.shutdown(wait=False)
+
+        for text in texts[done:]:
+            yield extractor(text)
+
     def _find_default_severity(self, action_result):
         try:
-            r = requests.get('{0}rest/severity'.format(self._get_phantom_base_url()), verify=False)  # nosemgrep
+            r = self._session.get('{0}rest/severity'.format(self._get_phantom_base_url()),  # nosemgrep
+                    verify=False, timeout=self._timeout)
             resp_json = r.json()
         except Exception as e:
             return RetVal(action_result.set_status(phantom.APP_ERROR, "Could not get severities \
@@ -1872,7 +3964,8 @@ class ServicenowConnector(BaseConnector):
     def _validate_custom_severity(self, action_result, severity):
 
         try:
-            r = requests.get('{0}rest/severity'.format(self._get_phantom_base_url()), verify=False)  # nosemgrep
+            r = self._session.get('{0}rest/severity'.format(self._get_phantom_base_url()),  # nosemgrep
+                    verify=False, timeout=self._timeout)
             resp_json = r.json()
         except Exception as e:
             return RetVal(action_result.set_status(phantom.APP_ERROR, "Could not get severities \
@@ -1940,6 +4033,31 @@ class ServicenowConnector(BaseConnector):
             ret_val = self._test_connectivity(param)
         elif action == self.ACTION_ID_RUN_QUERY:
             ret_val = self._run_query(param)
+        elif action == self.ACTION_ID_GET_TICKETS:
+            ret_val = self._get_tickets(param)
+        elif action == self.ACTION_ID_BULK_CREATE_TICKETS:
+            ret_val = self._bulk_ticket_operation(param, 'create')
+        elif action == self.ACTION_ID_BULK_UPDATE_TICKETS:
+            ret_val = self._bulk_ticket_operation(param, 'update')
+        elif action == self.ACTION_ID_BULK_ADD_WORK_NOTES:
+            ret_val = self._bulk_ticket_operation(param, 'work_note')
+        elif action == self.ACTION_ID_BULK_ADD_COMMENTS:
+            ret_val = self._bulk_ticket_operation(param, 'comment')
+
+        # The sys_id cache is only reported by the actions which looked up a ticket number
+        if self._sys_id_cache_stats['hits'] or self._sys_id_cache_stats['misses']:
+            for action_result in self.get_action_results():
+                action_result.update_summary({
+                    'sys_id_cache_hits': self._sys_id_cache_stats['hits'],
+                    'sys_id_cache_misses': self._sys_id_cache_stats['misses']})
+
+        # The retries are only reported when some requests had to be retried
+        if self._retry_stats['retries']:
+            for action_result in self.get_action_results():
+                action_result.update_summary({
+                    'retries': self._retry_stats['retries'],
+                    'backoff_seconds': round(self._retry_stats['backoff_seconds'], 2)})
+
         return ret_val
 
 
@@ -25,17 +25,41 @@ SERVICENOW_JSON_NEW_TICKET_ID = "created_ticket_id"
 SERVICENOW_JSON_GOT_TICKET_ID = "queried_ticket_id"
 SERVICENOW_JSON_SYS_ID = "sys_id"
 SERVICENOW_JSON_TICKET_ID = "id"
+SERVICENOW_JSON_TICKET_IDS = "ids"
 SERVICENOW_JSON_FIELDS = "fields"
 SERVICENOW_JSON_TABLE = "table"
 SERVICENOW_JSON_VAULT_ID = "vault_id"
 SERVICENOW_JSON_FILTER = "filter"
 SERVICENOW_JSON_ON_POLL_FILTER = "on_poll_filter"
 SERVICENOW_JSON_ON_POLL_TABLE = "on_poll_table"
+SERVICENOW_JSON_ON_POLL_TABLES = "on_poll_tables"
+SERVICENOW_JSON_OAUTH_EXPIRY_SKEW = "oauth_expiry_skew"
+SERVICENOW_JSON_MAX_RETRIES = "max_retries"
+SERVICENOW_JSON_RETRY_MAX_BACKOFF = "retry_max_backoff"
+SERVICENOW_JSON_RATE_LIMIT = "rate_limit"
+SERVICENOW_JSON_MAX_CONCURRENCY = "max_concurrency"
+SERVICENOW_JSON_ON_POLL_FIELDS = "on_poll_fields"
 SERVICENOW_JSON_QUERY_TABLE = "query_table"
 SERVICENOW_JSON_QUERY = "query"
 SERVICENOW_JSON_EXTRACT_IPS = "extract_ips"
 SERVICENOW_JSON_EXTRACT_HASHES = "extract_hashes"
 SERVICENOW_JSON_EXTRACT_URLS = "extract_urls"
+SERVICENOW_JSON_POOL_CONNECTIONS = "pool_connections"
+SERVICENOW_JSON_POOL_MAXSIZE = "pool_maxsize"
+SERVICENOW_JSON_CONNECT_TIMEOUT = "connect_timeout"
+SERVICENOW_JSON_READ_TIMEOUT = "read_timeout"
+SERVICENOW_JSON_PAGE_CONCURRENCY = "page_concurrency"
+SERVICENOW_JSON_EXTRACTION_WORKERS = "extraction_workers"
+SERVICENOW_JSON_INGEST_BATCH_SIZE = "ingest_batch_size"
+SERVICENOW_JSON_FINGERPRINT_CACHE_SIZE = "fingerprint_cache_size"
+SERVICENOW_JSON_SYS_ID_CACHE_SIZE = "sys_id_cache_size"
+SERVICENOW_JSON_OPERATIONS = "operations"
+SERVICENOW_JSON_MAX_ATTACHMENT_SIZE = "max_attachment_size"
+SERVICENOW_JSON_INGEST_ATTACHMENTS = "ingest_attachments"
+SERVICENOW_JSON_MAX_INGEST_ATTACHMENT_SIZE = "max_ingest_attachment_size"
+SERVICENOW_JSON_MAX_POLL_ATTACHMENT_SIZE = "max_poll_attachment_size"
+SERVICENOW_JSON_BACKFILL_SLICES = "backfill_slices"
+SERVICENOW_JSON_BACKFILL_WORKERS = "backfill_workers"
 
 SERVICENOW_ERR_CONNECTIVITY_TEST = "Test Connectivity Failed"
 SERVICENOW_SUCC_CONNECTIVITY_TEST = "Test Connectivity Passed"
@@ -57,6 +81,21 @@ SERVICENOW_ERR_BASIC_AUTH_NOT_GIVEN_FIRST_TIME = ('Provide username and password
 SERVICENOW_ERR_ONE_PARAM_REQ = ("Please specify at least one of the parameters"
     "short_description, description, or fields to create the ticket with")
 SERVICENOW_ERR_FAILURES = "Some tickets had issues during ingestion, see logs for details"
+SERVICENOW_ERR_ON_POLL_TABLES = "Please provide the on_poll_tables parameter as a JSON list of objects with a 'table' key " \
+    "and optional 'filter' and 'label' keys"
+SERVICENOW_ERR_OPERATIONS_JSON_PARSE = "Unable to parse the operations parameter: {error_msg}. " \
+    "Please ensure that provided input is in valid JSON format"
+SERVICENOW_ERR_ATTACHMENT_SIZE = "The size of the {file_name} file ({size} bytes) exceeds the max_attachment_size of {max_size} MB"
+SERVICENOW_ERR_ATTACHMENT_BUDGET = "The attachment exceeds the max_ingest_attachment_size or the remaining max_poll_attachment_size"
+SERVICENOW_ERR_TICKET_IDS = "Please provide a valid comma-separated list of SYS IDs or ticket numbers in the 'ids' parameter"
+SERVICENOW_ERR_NO_TICKETS_FOUND = "None of the provided tickets were found"
+SERVICENOW_ERR_OPERATIONS_LIST = "Please provide a non-empty JSON list in the operations parameter"
+SERVICENOW_ERR_BULK_ITEM_TYPE = "Please provide the item as a JSON dictionary"
+SERVICENOW_ERR_BULK_ITEM_NO_FIELDS = "Please specify at least one field, such as short_description or description, " \
+    "to create the ticket with"
+SERVICENOW_ERR_BULK_ITEM_KEY = "Please provide a valid '{key}' value for the item"
+SERVICENOW_ERR_BULK_TICKET_NUMBER = "Unable to fetch the ticket SYS ID for the provided ticket number: {number}"
+SERVICENOW_ERR_ON_POLL_TABLES_DUPLICATE = "The {table} table is listed more than once in the on_poll_tables parameter"
 SERVICENOW_ERROR_CODE_MESSAGE = "Error code unavailable"
 SERVICENOW_ERROR_MESSAGE = "Unknown error occurred. Please check the asset configuration and|or action parameters"
 TYPE_ERROR_MESSAGE = ("Error occurred while connecting to the ServiceNow server."
@@ -74,9 +113,70 @@ SERVICENOW_DEFAULT_TABLE = "incident"
 SERVICENOW_ITEM_OPT_MTOM_TABLE = "sc_item_option_mtom"
 SERVICENOW_ITEM_OPT_TABLE = "sc_item_option"
 SERVICENOW_ITEM_OPT_NEW_TABLE = "item_option_new"
+SERVICENOW_ITEM_OPT_FIELDS = "sys_id,value,item_option_new"
+SERVICENOW_ITEM_OPT_NEW_FIELDS = "sys_id,question_text"
+SERVICENOW_SYS_ID_CHUNK_SIZE = 100
+SERVICENOW_BATCH_ENDPOINT = "/v1/batch"
+SERVICENOW_BULK_OPERATIONS = ["create", "update", "work_note", "comment"]
+SERVICENOW_BULK_BATCH_SIZE = 50
+SERVICENOW_BULK_CONCURRENCY = 5
+SERVICENOW_BATCH_UNAVAILABLE_STATUS_CODES = (400, 403, 404, 405)
 
 SERVICENOW_DEFAULT_OFFSET = 0
 SERVICENOW_DEFAULT_LIMIT = 10000
 SERVICENOW_DEFAULT_MAX_LIMIT = 100
+SERVICENOW_CONTAINER_LOOKUP_CHUNK_SIZE = 100
+SERVICENOW_KEYSET_ORDER = "ORDERBYsys_updated_on^ORDERBYsys_id"
+# Fields the app relies on, always added to a sysparm_fields projection
+SERVICENOW_MANDATORY_FIELDS = ["sys_id", "sys_updated_on", "number", "short_description"]
+SERVICENOW_ON_POLL_MANDATORY_FIELDS = ["sys_mod_count"]
+
+SERVICENOW_DEFAULT_POOL_CONNECTIONS = 10
+SERVICENOW_DEFAULT_POOL_MAXSIZE = 10
+SERVICENOW_DEFAULT_CONNECT_TIMEOUT = 30
+SERVICENOW_DEFAULT_READ_TIMEOUT = 300
+SERVICENOW_DEFAULT_PAGE_CONCURRENCY = 1
+SERVICENOW_DEFAULT_EXTRACTION_WORKERS = 1
+SERVICENOW_EXTRACTION_BATCH_SIZE = 50
+SERVICENOW_DEFAULT_INGEST_BATCH_SIZE = 100
+SERVICENOW_DEFAULT_FINGERPRINT_CACHE_SIZE = 10000
+SERVICENOW_DEFAULT_SYS_ID_CACHE_SIZE = 1000
+SERVICENOW_DEFAULT_MAX_ATTACHMENT_SIZE = 0
+SERVICENOW_BYTES_PER_MB = 1024 * 1024
+SERVICENOW_HASH_BLOCK_SIZE = 1024 * 1024
+SERVICENOW_DEFAULT_MAX_INGEST_ATTACHMENT_SIZE = 25
+SERVICENOW_DEFAULT_MAX_POLL_ATTACHMENT_SIZE = 250
+SERVICENOW_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+SERVICENOW_ATTACHMENT_FIELDS = "sys_id,table_sys_id,file_name,size_bytes,hash"
+SERVICENOW_ATTACHMENT_SUMMARY_KEYS = ["attachments_ingested", "attachments_skipped", "attachments_failed", "attachment_bytes_ingested"]
+SERVICENOW_ATTACHMENT_UPLOAD_CONCURRENCY = 3
+SERVICENOW_UPLOAD_PROGRESS_STEP = 10 * 1024 * 1024
+SERVICENOW_UPLOAD_PROGRESS = "Uploaded {uploaded} of {total} bytes ({percentage}%) of {file_name}"
+SERVICENOW_FINGERPRINT_LENGTH = 16
+SERVICENOW_DEFAULT_BACKFILL_SLICES = 1
+SERVICENOW_DEFAULT_BACKFILL_WORKERS = 4
+SERVICENOW_BACKFILL_QUEUE_SIZE = 2
+SERVICENOW_DEFAULT_OAUTH_EXPIRY_SKEW = 60
+SERVICENOW_DEFAULT_MAX_RETRIES = 3
+SERVICENOW_DEFAULT_RETRY_MAX_BACKOFF = 60
+SERVICENOW_RETRY_BASE_DELAY = 1
+SERVICENOW_RETRY_MAX_DELAY = 30
+SERVICENOW_RETRY_STATUS_CODES = [500, 502, 503, 504]
+SERVICENOW_SUPPORTED_METHODS = ["get", "post", "put", "patch", "delete"]
+SERVICENOW_IDEMPOTENT_METHODS = ["get", "put", "delete"]
+SERVICENOW_DEFAULT_RATE_LIMIT = 0
+SERVICENOW_DEFAULT_MAX_CONCURRENCY = 0
+SERVICENOW_RATE_LIMIT_BURST = 1
+SERVICENOW_CONCURRENCY_POLL_INTERVAL = 0.05
+SERVICENOW_TICKET_DETAILS_CONCURRENCY = 3
+SERVICENOW_FINGERPRINT_IGNORED_FIELDS = ["sys_updated_on", "sys_updated_by", "sys_mod_count"]
+
+# Indicator type, CEF field and label of the artifacts extracted by On Poll
+SERVICENOW_IOC_ARTIFACTS = [
+    ('ip', 'ip_address', 'IP Address'),
+    ('ipv6', 'ipv6_address', 'IPV6 Address'),
+    ('hash', 'hash', 'Hash'),
+    ('url', 'URL', 'URL')
+]
 
 SERVICENOW_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
@@ -0,0 +1,98 @@
+# File: servicenow_ioc_extractor.py
+#
+# Copyright (c) 2016-2022 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+import ipaddress
+import re
+
+# The candidates are kept cheap to match, the IP addresses are validated with ipaddress afterwards
+# '%' is part of the '$-_' range, so the percent-encoded characters are matched as well
+URL_REGEX = '[Hh][Tt][Tt][Pp][Ss]?://[a-zA-Z0-9$-_@.&+#!*(),]+'
+HASH_REGEX = '\\b[0-9a-fA-F]{32,64}\\b'
+IPV6_REGEX = ('(?<![0-9A-Fa-f:])(?:[0-9A-Fa-f]{0,4}:){2,7}'
+    '(?:(?:\\d{1,3}\\.){3}\\d{1,3}|[0-9A-Fa-f]{1,4})?(?![0-9A-Fa-f:])')
+IP_REGEX = '(?<![\\d.])(?:\\d{1,3}\\.){3}\\d{1,3}(?!\\d|\\.\\d)'
+
+HASH_LENGTHS = (32, 40, 64)
+
+# An indicator only starts with a character that can open one of them, which lets the scan skip most
+# of the positions of the text without trying every alternative. The word boundaries are left to each
+# pattern, so an IP address glued to a word ('IP_10.1.2.3') is still found
+CANDIDATE_START_REGEX = '(?=[\\dA-Fa-f:Hh])'
+
+# Every indicator is found in a single scan of the text, the IP addresses and hashes which are
+# part of a URL are looked up again within the URL only
+IOC_REGEXC = re.compile('{0}(?:(?P<url>{1})|(?P<hash>{2})|(?P<ipv6>{3})|(?P<ip>{4}))'.format(
+    CANDIDATE_START_REGEX, URL_REGEX, HASH_REGEX, IPV6_REGEX, IP_REGEX))
+NON_URL_IOC_REGEXC = re.compile('{0}(?:(?P<hash>{1})|(?P<ipv6>{2})|(?P<ip>{3}))'.format(
+    CANDIDATE_START_REGEX, HASH_REGEX, IPV6_REGEX, IP_REGEX))
+
+
+def get_issue_text(issue):
+    """ This function returns the text to extract the indicators of a ticket/record from.
+    :param issue: Dictionary of the ticket/record fields
+    :return: values of the fields, one per line
+    """
+
+    return '\n'.join(value if isinstance(value, str) else str(value) for value in issue.values())
+
+
+def _add_indicator(iocs, ioc_type, value):
+
+    try:
+        if ioc_type == 'ip':
+            ipaddress.IPv4Address(value)
+        elif ioc_type == 'ipv6':
+            if ipaddress.IPv6Address(value).is_unspecified:
+                return
+        elif ioc_type == 'hash' and len(value) not in HASH_LENGTHS:
+            return
+    except ValueError:
+        return
+
+    # Dictionaries keep the insertion order, so the indicators are de-duplicated in the order found
+    iocs[ioc_type][value] = None
+
+
+def extract_iocs(text, extract_ips=False, extract_hashes=False, extract_urls=False):
+    """ This function extracts the unique IP addresses, IPv6 addresses, hashes and URLs of a text.
+    :param text: Text to extract the indicators from
+    :param extract_ips: Whether to extract the IP and IPv6 addresses
+    :param extract_hashes: Whether to extract the hashes
+    :param extract_urls: Whether to extract the URLs
+    :return: dictionary of indicator type ('ip', 'ipv6', 'hash' and 'url') to list of indicators
+    """
+
+    iocs = {'ip': {}, 'ipv6': {}, 'hash': {}, 'url': {}}
+    wanted = set()
+    if extract_ips:
+        wanted.update(('ip', 'ipv6'))
+    if extract_hashes:
+        wanted.add('hash')
+    if extract_urls:
+        wanted.add('url')
+
+    if wanted:
+        regexc = IOC_REGEXC if extract_urls else NON_URL_IOC_REGEXC
+        for match in regexc.finditer(text):
+            ioc_type = match.lastgroup
+            if ioc_type == 'url':
+                iocs['url'][match.group()] = None
+                if wanted != {'url'}:
+                    for url_match in NON_URL_IOC_REGEXC.finditer(match.group()):
+                        if url_match.lastgroup in wanted:
+                            _add_indicator(iocs, url_match.lastgroup, url_match.group())
+            elif ioc_type in wanted:
+                _add_indicator(iocs, ioc_type, match.group())
+
+    return {ioc_type: list(values) for ioc_type, values in iocs.items()}
@@ -0,0 +1,51 @@
+# File: test_servicenow_ioc_extractor.py
+#
+# Copyright (c) 2016-2022 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servicenow_ioc_extractor import extract_iocs  # noqa: E402
+
+
+class TestExtractIocs(unittest.TestCase):
+
+    def _extract(self, text):
+        return extract_iocs(text, extract_ips=True, extract_hashes=True, extract_urls=True)
+
+    def test_ip_after_underscore(self):
+        self.assertEqual(self._extract('IP_10.1.2.3')['ip'], ['10.1.2.3'])
+
+    def test_ip_after_letter(self):
+        self.assertEqual(self._extract('e10.0.0.1')['ip'], ['10.0.0.1'])
+
+    def test_ip_not_split_from_longer_number(self):
+        self.assertEqual(self._extract('1234.1.2.3 1.2.3.4.5')['ip'], [])
+
+    def test_hash_within_word_is_ignored(self):
+        self.assertEqual(self._extract('x{0} {1}'.format('b' * 32, 'a' * 32))['hash'], ['a' * 32])
+
+    def test_ip_in_url(self):
+        iocs = self._extract('see http://a.com/x?ip=5.6.7.8 and 1.2.3.4')
+        self.assertEqual(iocs['url'], ['http://a.com/x?ip=5.6.7.8'])
+        self.assertEqual(iocs['ip'], ['5.6.7.8', '1.2.3.4'])
+
+    def test_ipv6(self):
+        self.assertEqual(self._extract('host fe80::1 and ::')['ipv6'], ['fe80::1'])
+
+
+if __name__ == '__main__':
+    unittest.main()